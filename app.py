@@ -1,16 +1,21 @@
+import copy
 import streamlit as st
 import config
 from utils.questions import QUESTIONS, get_total_questions
-from utils.data_manager import download_button, upload_button, render_answers_sidebar, get_progress_stats, render_new_project_button, auto_save, load_from_storage
+from utils.data_manager import download_button, upload_button, render_answers_sidebar, get_progress_stats, render_new_project_button, auto_save, load_from_storage, get_session_id
 from utils.voice_input import render_voice_or_text_input
-from utils.ai_analysis import analyze_with_claude, extract_score, generate_quick_insights
+from utils.ai_analysis import generate_quick_insights, render_prompt_budget, render_usage
+from utils.analysis_engine import estimate_prompt, run_analysis
 from utils.visualizations import (
-    create_progress_chart, create_score_gauge, create_impact_matrix,
-    render_mermaid_diagram, create_workflow_comparison, create_feasibility_radar,
-    create_risk_heatmap
+    create_progress_chart, create_score_gauge, build_impact_matrix,
+    render_mermaid_diagram, create_workflow_comparison, build_feasibility_radar,
+    build_risk_heatmap
 )
+from utils.derived_metrics import get_derived_metrics
 from utils.kb_table import render_kb_table
-from utils.export import render_pdf_download_button
+from utils.export import render_pdf_download_button, warm_chart_images
+from utils.jobs import get_job_manager, analysis_job_key, DONE, FAILED
+from utils.rate_limit import get_rate_limiter
 
 # Page configuration
 st.set_page_config(
@@ -108,6 +113,9 @@ def init_session_state():
     if 'analysis_results' not in st.session_state:
         st.session_state.analysis_results = None
 
+    if 'analysis_job_id' not in st.session_state:
+        st.session_state.analysis_job_id = None
+
 
 init_session_state()
 
@@ -391,6 +399,103 @@ def render_to_be_section():
                     st.success("✅ Sezione TO-BE completata! Passa all'Analisi Finale.")
                     st.rerun()
 
+# Analysis sections shown in the results page (keys without accents to match ai_analysis.py)
+ANALYSIS_SECTIONS_DISPLAY = {
+    "fattibilita_tecnica": ("🔧 Fattibilita Tecnica", "info"),
+    "analisi_impatto_sostituzione_vs_augmentation": ("⚖️ Sostituzione vs Augmentation", "warning"),
+    "risparmio_di_tempo_stimato": ("⏱️ Risparmio di Tempo", "success"),
+    "riduzione_costi": ("💰 Riduzione Costi", "success"),
+    "attivita_eliminate_o_ottimizzate": ("✂️ Attivita Ottimizzate", "info"),
+    "rischi_e_criticita": ("⚠️ Rischi e Criticita", "warning"),
+    "formazione_necessaria": ("🎓 Formazione", "info"),
+    "problemi_legali_e_privacy": ("⚖️ Aspetti Legali e Privacy", "warning"),
+    "roadmap_implementazione": ("🗺️ Roadmap", "success"),
+    "diagramma_flusso_agentico": ("📊 Diagramma Flusso Agentico", "diagram"),
+    "raccomandazioni_finali": ("💡 Raccomandazioni", "info")
+}
+
+def render_analysis_block(key, content):
+    """Render a single analysis section inside its expander"""
+    title, msg_type = ANALYSIS_SECTIONS_DISPLAY[key]
+    with st.expander(title, expanded=(key in ["raccomandazioni_finali", "roadmap_implementazione", "diagramma_flusso_agentico"])):
+        if msg_type == "diagram":
+            # Extract and render Mermaid diagram
+            render_mermaid_diagram(content)
+        elif msg_type == "info":
+            st.info(content)
+        elif msg_type == "warning":
+            st.warning(content)
+        elif msg_type == "success":
+            st.success(content)
+        else:
+            st.markdown(content)
+
+def render_analysis_job():
+    """Start the background analysis job, or show its progress until it finishes"""
+    manager = get_job_manager()
+    job_key = analysis_job_key("v1", st.session_state.answers)
+    job = manager.get(st.session_state.get("analysis_job_id")) or manager.find_active(job_key)
+
+    if job and job.status == FAILED:
+        st.error(f"❌ Errore nella generazione dell'analisi. {job.error or 'Verifica la API key Anthropic e riprova.'}")
+        st.session_state.analysis_job_id = None
+        job = None
+
+    if job is None:
+        # Idle: rendered once per rerun, no polling
+        render_prompt_budget(estimate_prompt(st.session_state.answers, "v1"))
+        if st.button("🚀 Genera Analisi con AI", type="primary"):
+            # Snapshot answers: the job must not see later edits
+            answers = copy.deepcopy(st.session_state.answers)
+            session_id = get_session_id()
+            # st.secrets is read here, in the script thread
+            api_key = config.get_api_key("ANTHROPIC_API_KEY")
+            st.session_state.analysis_job_id = manager.submit(
+                session_id,
+                job_key,
+                lambda job: run_analysis(answers, "v1", api_key=api_key, on_event=job.on_event,
+                                         session_id=session_id).sections
+            )
+            st.rerun()
+        return
+
+    st.session_state.analysis_job_id = job.id
+    render_analysis_progress(job.id)
+
+@st.fragment(run_every=config.ANALYSIS_JOBS["poll_interval"])
+def render_analysis_progress(job_id):
+    """Progress of a queued/running job, polled until it finishes"""
+    manager = get_job_manager()
+    job = manager.get(job_id)
+
+    if job is None or job.status == FAILED:
+        # Full rerun: render_analysis_job shows the error and the button again
+        st.rerun()
+
+    if job.status == DONE:
+        st.session_state.analysis_results = job.result
+        st.session_state.analysis_usage = job.usage
+        # PDF charts rendered while the user reads the analysis
+        warm_chart_images(st.session_state.answers, job.result)
+        st.session_state.analysis_job_id = None
+        st.rerun()
+
+    position = manager.queue_position(job.id)
+    api_position = get_rate_limiter("anthropic").queue_position(job.session_id)
+    if position:
+        st.info(f"⏳ Analisi in coda (posizione {position})...")
+    elif api_position:
+        st.info(f"⏳ Molte richieste in aula: sei in coda per l'API Claude (posizione {api_position})...")
+    else:
+        st.info(f"🤖 Analisi in corso... {job.elapsed():.0f}s - puoi continuare a navigare, il risultato non andrà perso")
+    render_prompt_budget(job.prompt_report)
+
+    # Sections streamed so far
+    for key in ANALYSIS_SECTIONS_DISPLAY:
+        content = job.sections.get(key)
+        if content:
+            render_analysis_block(key, content)
+
 def render_analysis_section():
     """Render analysis section with AI insights"""
 
@@ -404,19 +509,20 @@ def render_analysis_section():
         st.warning("⚠️ Completa almeno le domande obbligatorie di AS-IS e TO-BE per generare l'analisi.")
         return
 
-    # Generate analysis button
+    # Generate analysis (background job: survives reruns and tab switches)
     if not st.session_state.analysis_results:
-        if st.button("🚀 Genera Analisi con AI", type="primary"):
-            analysis = analyze_with_claude(st.session_state.answers)
-            if analysis:
-                st.session_state.analysis_results = analysis
-                st.rerun()
+        render_analysis_job()
     else:
         # Display analysis results
         st.success("✅ Analisi completata!")
+        render_usage(st.session_state.get("analysis_usage"))
+
+        # Derived metrics: computed once per analysis/answers, reused across reruns
+        metrics = get_derived_metrics(st.session_state, st.session_state.analysis_results,
+                                      st.session_state.answers)
 
         # Overall score
-        score = extract_score(st.session_state.analysis_results)
+        score = metrics["score"]
         if score:
             col1, col2 = st.columns([1, 2])
             with col1:
@@ -428,36 +534,11 @@ def render_analysis_section():
 
         st.divider()
 
-        # Display all sections (keys without accents to match ai_analysis.py)
-        sections_display = {
-            "fattibilita_tecnica": ("🔧 Fattibilita Tecnica", "info"),
-            "analisi_impatto_sostituzione_vs_augmentation": ("⚖️ Sostituzione vs Augmentation", "warning"),
-            "risparmio_di_tempo_stimato": ("⏱️ Risparmio di Tempo", "success"),
-            "riduzione_costi": ("💰 Riduzione Costi", "success"),
-            "attivita_eliminate_o_ottimizzate": ("✂️ Attivita Ottimizzate", "info"),
-            "rischi_e_criticita": ("⚠️ Rischi e Criticita", "warning"),
-            "formazione_necessaria": ("🎓 Formazione", "info"),
-            "problemi_legali_e_privacy": ("⚖️ Aspetti Legali e Privacy", "warning"),
-            "roadmap_implementazione": ("🗺️ Roadmap", "success"),
-            "diagramma_flusso_agentico": ("📊 Diagramma Flusso Agentico", "diagram"),
-            "raccomandazioni_finali": ("💡 Raccomandazioni", "info")
-        }
-
-        for key, (title, msg_type) in sections_display.items():
+        # Display all sections
+        for key in ANALYSIS_SECTIONS_DISPLAY:
             content = st.session_state.analysis_results.get(key, "")
             if content:
-                with st.expander(title, expanded=(key in ["raccomandazioni_finali", "roadmap_implementazione", "diagramma_flusso_agentico"])):
-                    if msg_type == "diagram":
-                        # Extract and render Mermaid diagram
-                        render_mermaid_diagram(content)
-                    elif msg_type == "info":
-                        st.info(content)
-                    elif msg_type == "warning":
-                        st.warning(content)
-                    elif msg_type == "success":
-                        st.success(content)
-                    else:
-                        st.markdown(content)
+                render_analysis_block(key, content)
 
         st.divider()
 
@@ -469,15 +550,12 @@ def render_analysis_section():
 
         with col1:
             # Radar chart - multi-dimensional analysis
-            fig_radar = create_feasibility_radar(st.session_state.analysis_results)
+            fig_radar = build_feasibility_radar(metrics["radar"])
             st.plotly_chart(fig_radar, use_container_width=True)
 
         with col2:
             # Impact matrix (dynamic positioning based on analysis)
-            fig = create_impact_matrix(
-                analysis_results=st.session_state.analysis_results,
-                answers=st.session_state.answers
-            )
+            fig = build_impact_matrix(metrics["position"])
             st.plotly_chart(fig, use_container_width=True)
 
         # Row 2: Risk heatmap and Workflow comparison
@@ -485,7 +563,7 @@ def render_analysis_section():
 
         with col3:
             # Risk heatmap
-            fig_risk = create_risk_heatmap(st.session_state.analysis_results)
+            fig_risk = build_risk_heatmap(metrics["risks"])
             st.plotly_chart(fig_risk, use_container_width=True)
 
         with col4:
@@ -508,6 +586,9 @@ def render_analysis_section():
         with col_btn2:
             if st.button("🔄 Rigenera Analisi", use_container_width=True):
                 st.session_state.analysis_results = None
+                st.session_state.analysis_usage = None
+                st.session_state.analysis_metrics = None
+                st.session_state.pdf_export = None
                 st.rerun()
 
 # Main routing logic
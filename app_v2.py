@@ -13,12 +13,16 @@ Target audience: Executive/Manager
 Goal: Discover AI opportunities (not detailed design)
 """
 
+import copy
 import streamlit as st
 import config
 from utils_v2.questions_v2 import QUESTIONS_V2, get_total_questions_v2, get_progress_stats_v2
 from utils_v2.onboarding import render_onboarding
-from utils_v2.ai_analysis_v2 import analyze_with_claude_v2
-from utils.data_manager import download_button, upload_button
+from utils.ai_analysis import render_prompt_budget, render_usage
+from utils.analysis_engine import estimate_prompt, run_analysis
+from utils.data_manager import download_button, upload_button, get_session_id
+from utils.jobs import get_job_manager, analysis_job_key, DONE, FAILED
+from utils.rate_limit import get_rate_limiter
 from utils.voice_input import render_voice_or_text_input
 
 # ============================================================================
@@ -134,6 +138,9 @@ def init_session_state_v2():
     if 'analysis_v2' not in st.session_state:
         st.session_state.analysis_v2 = None
 
+    if 'analysis_job_id' not in st.session_state:
+        st.session_state.analysis_job_id = None
+
     if 'onboarding_complete' not in st.session_state:
         st.session_state.onboarding_complete = False
 
@@ -521,23 +528,94 @@ def render_input_by_type_v2(question):
 # RENDER FINAL ANALYSIS
 # ============================================================================
 
+# Titoli per l'anteprima in streaming dei 4 layer
+LAYER_PREVIEW_TITLES = {
+    "layer_1": "📊 Executive Summary",
+    "layer_2": "🧠 Ragionamento",
+    "layer_3": "🗺️ Roadmap Dettagliata",
+    "layer_4": "✅ Action Plan",
+}
+
+
+def render_analysis_job_v2():
+    """Avvia l'analisi in background o mostra l'avanzamento finché non è pronta"""
+    manager = get_job_manager()
+    job_key = analysis_job_key("v2", st.session_state.answers_v2)
+    job = manager.get(st.session_state.get("analysis_job_id")) or manager.find_active(job_key)
+
+    if job and job.status == FAILED:
+        st.error(f"❌ Errore nella generazione dell'analisi. {job.error or 'Verifica le API keys.'}")
+        st.session_state.analysis_job_id = None
+        job = None
+
+    if job is None:
+        # Nessun job: disegnato una volta per rerun, senza polling
+        render_prompt_budget(estimate_prompt(st.session_state.answers_v2, "v2"))
+        if st.button("🚀 Genera Analisi Completa", type="primary", use_container_width=True):
+            # Copia delle risposte: il job non deve vedere modifiche successive
+            answers = copy.deepcopy(st.session_state.answers_v2)
+            session_id = get_session_id()
+            # st.secrets letto qui, nel thread dello script
+            api_key = config.get_api_key("ANTHROPIC_API_KEY")
+            st.session_state.analysis_job_id = manager.submit(
+                session_id,
+                job_key,
+                lambda job: run_analysis(answers, "v2", api_key=api_key, on_event=job.on_event,
+                                         session_id=session_id).sections
+            )
+            st.rerun()
+        return
+
+    st.session_state.analysis_job_id = job.id
+    render_analysis_progress_v2(job.id)
+
+
+@st.fragment(run_every=config.ANALYSIS_JOBS["poll_interval"])
+def render_analysis_progress_v2(job_id):
+    """Avanzamento di un job in coda o in corso, aggiornato finché non termina"""
+    manager = get_job_manager()
+    job = manager.get(job_id)
+
+    if job is None or job.status == FAILED:
+        # Rerun completo: render_analysis_job_v2 mostra l'errore e di nuovo il pulsante
+        st.rerun()
+
+    if job.status == DONE:
+        st.session_state.analysis_v2 = job.result
+        st.session_state.analysis_usage = job.usage
+        st.session_state.analysis_job_id = None
+        st.rerun()
+
+    position = manager.queue_position(job.id)
+    api_position = get_rate_limiter("anthropic").queue_position(job.session_id)
+    if position:
+        st.info(f"⏳ Analisi in coda (posizione {position})...")
+    elif api_position:
+        st.info(f"⏳ Molte richieste in aula: sei in coda per l'API Claude (posizione {api_position})...")
+    else:
+        st.info(f"🤖 Sto analizzando il tuo progetto... {job.elapsed():.0f}s (30-45 secondi)")
+    render_prompt_budget(job.prompt_report)
+
+    # Anteprima progressiva: ogni LAYER appare appena completato
+    for key, title in LAYER_PREVIEW_TITLES.items():
+        content = job.sections.get(key)
+        if content:
+            with st.expander(title, expanded=True):
+                st.markdown(content)
+
+
 def render_final_analysis_v2():
     """Render analisi finale con 4 layer educativi"""
 
     st.markdown("## 🎯 La Tua Analisi Personalizzata")
 
     if not st.session_state.analysis_v2:
-        if st.button("🚀 Genera Analisi Completa", type="primary", use_container_width=True):
-            with st.spinner("Sto analizzando il tuo progetto... (30-45 secondi)"):
-                analysis = analyze_with_claude_v2(st.session_state.answers_v2)
-                if analysis:
-                    st.session_state.analysis_v2 = analysis
-                    st.rerun()
-                else:
-                    st.error("❌ Errore nella generazione dell'analisi. Verifica le API keys.")
+        # Analisi in background: sopravvive a rerun e click durante la generazione
+        render_analysis_job_v2()
         st.stop()
 
     analysis = st.session_state.analysis_v2
+    render_usage(st.session_state.get("analysis_usage"))
 
     # ========================================================================
     # LAYER 1: EXECUTIVE SUMMARY (sempre visibile)
@@ -644,6 +722,8 @@ def render_final_analysis_v2():
             st.session_state.answers_v2 = {}
             st.session_state.current_question = 0
             st.session_state.analysis_v2 = None
+            st.session_state.analysis_usage = None
+            st.session_state.analysis_job_id = None
             st.rerun()
 
 
@@ -0,0 +1,101 @@
+"""
+Batch analysis of exported workshop projects (headless, no Streamlit)
+
+Analyzes every agentic_ai_project_*.json / agentic_ai_workshop_v2_*.json
+in a directory and writes the result into each file's "analysis" field.
+Already analyzed files are skipped: re-run the same command to resume.
+
+Usage:
+    ANTHROPIC_API_KEY=... python batch_analyze.py exports/
+    python batch_analyze.py exports/ --transport batches --model claude-3-haiku-20240307
+    python batch_analyze.py exports/ --transport fake      # dry run, no API calls
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from utils.batch import (
+    BATCH_STATE_FILE,
+    DirectTransport,
+    FakeTransport,
+    MessageBatchesTransport,
+    analyze_exports,
+    find_exports,
+    load_items,
+)
+
+
+def build_transport(args):
+    if args.transport == "fake":
+        return FakeTransport()
+
+    # Read the key from the environment only: config.get_api_key would import Streamlit
+    api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+    if not api_key:
+        sys.exit("ANTHROPIC_API_KEY non configurata")
+
+    from utils.clients import get_anthropic_client
+    client = get_anthropic_client(api_key)
+
+    if args.transport == "batches":
+        return MessageBatchesTransport(
+            client,
+            model=args.model,
+            state_path=os.path.join(args.directory, BATCH_STATE_FILE),
+            poll_interval=args.poll_interval,
+        )
+    return DirectTransport(client, models=[args.model] if args.model else None, concurrency=args.concurrency)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisi AI in batch dei progetti esportati dal workshop")
+    parser.add_argument("directory", help="cartella con i file JSON esportati")
+    parser.add_argument("--transport", choices=["direct", "batches", "fake"], default="direct",
+                        help="direct: Messages API; batches: Message Batches API; fake: risposte simulate")
+    parser.add_argument("--concurrency", type=int, default=4, help="richieste contemporanee (transport direct)")
+    parser.add_argument("--model", default=None, help="modello Claude (default: fallback di config.CLAUDE_MODELS)")
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="secondi tra i controlli del batch")
+    parser.add_argument("--force", action="store_true", help="rianalizza anche i file già analizzati")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        sys.exit(f"Cartella non trovata: {args.directory}")
+
+    items, skipped = load_items(find_exports(args.directory), force=args.force)
+    for path, reason in skipped:
+        print(f"- {os.path.basename(path)}: saltato ({reason})")
+    if not items:
+        print("Nessun progetto da analizzare.")
+        return 0
+
+    print(f"Analisi di {len(items)} progetti ({args.transport})...")
+    transport = build_transport(args)
+    start = time.time()
+    done = [0]
+
+    def on_progress(item, error):
+        done[0] += 1
+        status = "ok" if error is None else f"ERRORE: {error}"
+        print(f"[{done[0]}/{len(items)}] {item.name} ({item.version}): {status}")
+
+    try:
+        summary = analyze_exports(items, transport, on_progress=on_progress)
+    except KeyboardInterrupt:
+        print(f"\nInterrotto dopo {done[0]} progetti. Rilancia lo stesso comando per riprendere.")
+        return 130
+
+    print(f"\nCompletati: {len(summary['analyzed'])}, errori: {len(summary['failed'])}, "
+          f"saltati: {len(skipped)} in {time.time() - start:.1f}s")
+    print(f"Prompt: ~{summary['prompt_tokens']} token stimati "
+          f"(-{summary['tokens_saved']} con la compattazione delle risposte)")
+    usage = summary["usage"]
+    if usage["input_tokens"] or usage["cache_read_input_tokens"]:
+        print(f"Token fatturati: input {usage['input_tokens']}, output {usage['output_tokens']}, "
+              f"cache scritti {usage['cache_creation_input_tokens']}, cache letti {usage['cache_read_input_tokens']}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark: Whisper upload size before/after the audio encoding stage
+
+Synthesizes speech-like recordings (harmonics modulated at syllable rate
+plus noise) as the recorder returns them, runs encode_for_upload with each
+output format and reports bytes, ratio, encoding time and the upload time
+on a given uplink. Opus/MP3 need ffmpeg (PATH or --ffmpeg).
+
+Usage:
+    python benchmarks/bench_audio_encoding.py [--seconds 10 60 300] [--uplink-mbps 2] [--ffmpeg PATH]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from utils.audio_encoding import encode_for_upload, ffmpeg_binary  # noqa: E402
+
+
+def recording(seconds, sample_rate, channels):
+    """16-bit PCM WAV of a voice-like signal"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 20 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.2 * t) > -0.5)
+    signal = 0.25 * voice * syllables + 0.01 * rng.standard_normal(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.repeat(pcm, channels).tobytes())
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=int, nargs="+", default=[10, 60, 300])
+    parser.add_argument("--uplink-mbps", type=float, default=2.0, help="upload bandwidth (Wi-Fi condiviso)")
+    parser.add_argument("--ffmpeg", default=None, help="ffmpeg executable (default: config/PATH)")
+    args = parser.parse_args()
+
+    settings = dict(config.VOICE_AUDIO, max_upload_bytes=10**12)
+    if args.ffmpeg:
+        settings["ffmpeg"] = args.ffmpeg
+    outputs = [("WAV 16 kHz mono", dict(settings, ffmpeg=None))]
+    if ffmpeg_binary(settings):
+        outputs += [(f"{encoder['codec']} {encoder['bitrates'][0]}", dict(settings, encoders=[encoder]))
+                    for encoder in settings["encoders"]]
+    else:
+        print("ffmpeg non trovato: solo WAV 16 kHz mono")
+
+    def upload_seconds(size):
+        return size * 8 / (args.uplink_mbps * 1e6)
+
+    for seconds in args.seconds:
+        # Recorder output: browser default (48 kHz stereo) and with sample_rate=16000 (stereo)
+        for source, rate in (("48 kHz stereo", 48000), ("16 kHz stereo", 16000)):
+            audio_bytes = recording(seconds, rate, 2)
+            print(f"{seconds}s, registrazione {source}: {len(audio_bytes) / 2**20:.2f} MB, "
+                  f"upload {upload_seconds(len(audio_bytes)):.1f}s a {args.uplink_mbps:g} Mbit/s")
+            for label, output_settings in outputs:
+                started = time.perf_counter()
+                encoded = encode_for_upload(audio_bytes, output_settings)
+                elapsed = time.perf_counter() - started
+                size = len(encoded.data)
+                print(f"  {label:22s} {size / 1024:9.0f} KB  x{len(audio_bytes) / size:5.1f}  "
+                      f"encoding {elapsed * 1000:6.0f} ms  upload {upload_seconds(size):6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Microbenchmark: single-pass V1 section parser vs the original line-by-line one
+
+Checks that both produce the same output, then times them on long
+synthetic V1 responses. The V2 parser keeps its per-layer str.find path:
+a single regex pass measured slower on typical V2 responses (0.7x at 10 KB).
+
+Usage:
+    python benchmarks/bench_parsers.py [--repeat 200] [--scale 20]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.analysis_prompts import SECTION_MARKERS, parse_analysis_response  # noqa: E402
+
+
+# ============================================================================
+# ORIGINAL PARSERS (reference implementations, before the single-pass parser)
+# ============================================================================
+
+def legacy_match_section_header(line):
+    if not line.startswith('#'):
+        return None
+
+    for marker in SECTION_MARKERS:
+        if marker in line:
+            key = marker.lower().replace(' ', '_').replace(':', '')
+            accent_map = {
+                'à': 'a', 'è': 'e', 'é': 'e', 'ì': 'i', 'ò': 'o', 'ù': 'u',
+                'á': 'a', 'í': 'i', 'ó': 'o', 'ú': 'u'
+            }
+            for accent, plain in accent_map.items():
+                key = key.replace(accent, plain)
+            return key
+
+    return None
+
+
+def legacy_parse_analysis_response(analysis_text):
+    sections = {}
+    current_section = "introduction"
+    current_content = []
+
+    for line in analysis_text.split('\n'):
+        key = legacy_match_section_header(line)
+        if key:
+            if current_content:
+                sections[current_section] = '\n'.join(current_content).strip()
+            current_section = key
+            current_content = []
+        elif line.strip():
+            current_content.append(line)
+
+    if current_content:
+        sections[current_section] = '\n'.join(current_content).strip()
+
+    return sections
+
+
+# ============================================================================
+# SYNTHETIC RESPONSES
+# ============================================================================
+
+FILLER = ("Il processo attuale richiede controlli manuali ripetuti e passaggi tra reparti, "
+          "con tempi di attesa che l'agente può ridurre in modo significativo.")
+
+
+def make_response_v1(scale):
+    parts = ["Ecco l'analisi del progetto.\n"]
+    for marker in SECTION_MARKERS:
+        body = "\n".join(f"- {FILLER}" for _ in range(scale))
+        if marker == "SCORE COMPLESSIVO":
+            body = "8/10\n" + body
+        parts.append(f"## {marker}\n\n{body}\n")
+    return "\n".join(parts)
+
+
+def bench(label, fn, text, repeat):
+    seconds = min(timeit.repeat(lambda: fn(text), number=repeat, repeat=3)) / repeat
+    print(f"  {label:<12} {seconds * 1e6:10.1f} µs/parse")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=20, help="righe di riempimento per sezione")
+    args = parser.parse_args()
+
+    text = make_response_v1(args.scale)
+    assert legacy_parse_analysis_response(text) == parse_analysis_response(text), \
+        "V1: output diverso dal parser originale"
+    print(f"V1 ({len(text) / 1024:.1f} KB)")
+    before = bench("originale", legacy_parse_analysis_response, text, args.repeat)
+    after = bench("single-pass", parse_analysis_response, text, args.repeat)
+    print(f"  speedup      {before / after:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
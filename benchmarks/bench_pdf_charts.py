@@ -0,0 +1,75 @@
+"""
+Benchmark: raster (matplotlib PNG) vs vector (fpdf primitives) PDF charts
+
+Builds the full analysis PDF with both chart modes and reports the median
+generation time and the file size. Raster is measured with a cold image
+cache (every chart rendered) and a warm one (PNG bytes reused).
+
+Usage:
+    python benchmarks/bench_pdf_charts.py [--repeat 5] [--core-fonts]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from utils.export import MATPLOTLIB_AVAILABLE, generate_analysis_pdf, get_chart_image_cache  # noqa: E402
+
+SECTIONS = [
+    "fattibilita_tecnica", "analisi_impatto_sostituzione_vs_augmentation", "risparmio_di_tempo_stimato",
+    "riduzione_costi", "attivita_eliminate_o_ottimizzate", "rischi_e_criticita", "formazione_necessaria",
+    "problemi_legali_e_privacy", "roadmap_implementazione", "raccomandazioni_finali",
+]
+
+ANALYSIS = {key: "La fattibilità è alta: l'agente gestisce l'80% dei casi con supervisione umana. " * 8
+            for key in SECTIONS}
+ANALYSIS["score_complessivo"] = "7/10"
+ANALYSIS["rischi_e_criticita"] += "Rischio tecnico e resistenza al cambiamento; GDPR critico."
+
+ANSWERS = {
+    "as_is_processo": "Gestione delle richieste di rimborso",
+    "as_is_step": "Ricezione\nVerifica\nApprovazione\nPagamento",
+    "to_be_tool": "CRM, ERP",
+    "to_be_azioni_limiti": "Approvazione umana sopra 500 euro",
+}
+
+
+def measure(mode, repeat, cold):
+    config.CHART_IMAGES["mode"] = mode
+    generate_analysis_pdf(ANSWERS, ANALYSIS)  # fonts, imports
+    times = []
+    for _ in range(repeat):
+        if cold:
+            get_chart_image_cache().clear()
+        started = time.perf_counter()
+        pdf_bytes = generate_analysis_pdf(ANSWERS, ANALYSIS)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), len(pdf_bytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--core-fonts", action="store_true", help="Helvetica instead of the Unicode TTF")
+    args = parser.parse_args()
+    config.PDF_FONT["unicode"] = not args.core_fonts
+
+    runs = [("vector (fpdf)", "vector", False)]
+    if MATPLOTLIB_AVAILABLE:
+        runs += [("raster, cache fredda", "raster", True), ("raster, cache calda", "raster", False)]
+    else:
+        print("matplotlib non installato: solo grafici vettoriali")
+
+    print(f"Font: {'Helvetica' if args.core_fonts else 'Unicode TTF'}")
+    for label, mode, cold in runs:
+        seconds, size = measure(mode, args.repeat, cold)
+        print(f"  {label:24s} {seconds * 1000:8.0f} ms {size / 1024:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: peak memory of the PDF output, in-memory vs streamed
+
+Builds a booklet of N sample reports (distinct chart values) and measures with
+tracemalloc the peak Python memory of:
+  - bytes(pdf.output()): the previous path (fpdf buffer + copy)
+  - pdf_bytes(pdf): streamed into one BytesIO (what the app keeps)
+  - write_pdf(pdf, file): streamed to a temporary file (export_pdfs.py)
+"output" is the peak while serializing, on top of the laid-out document;
+"totale" includes the layout. Fonts are loaded before measuring.
+
+Usage:
+    python benchmarks/bench_pdf_memory.py [--reports 1 10 40] [--raster]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from benchmarks.bench_pdf_charts import ANALYSIS, ANSWERS  # noqa: E402
+from utils.export import AnalysisPDF, add_analysis_report, generate_analysis_pdf  # noqa: E402
+from utils.pdf_stream import pdf_bytes, write_pdf  # noqa: E402
+
+
+def sample_report(index):
+    """Answers and analysis of report index, with its own chart values (no shared images)"""
+    analysis = dict(ANALYSIS, fattibilita_tecnica=f"Fattibilità {1 + index % 40 / 10:.1f}/5. "
+                    + ANALYSIS["fattibilita_tecnica"])
+    answers = dict(ANSWERS, as_is_step="\n".join(f"Step {step}" for step in range(index % 10 + 1)))
+    return answers, analysis
+
+
+def _legacy(pdf):
+    return len(bytes(pdf.output()))
+
+
+def _bytes_io(pdf):
+    return len(pdf_bytes(pdf))
+
+
+def _temp_file(pdf):
+    with tempfile.TemporaryFile() as f:
+        return write_pdf(pdf, f)
+
+
+METHODS = (
+    ("bytes(pdf.output())", _legacy),
+    ("pdf_bytes (BytesIO)", _bytes_io),
+    ("write_pdf (file)", _temp_file),
+)
+
+
+def build_booklet(reports):
+    pdf = AnalysisPDF()
+    for index in range(reports):
+        answers, analysis = sample_report(index)
+        add_analysis_report(pdf, answers, analysis, title=f"Progetto {index + 1}")
+    return pdf
+
+
+def measure(output, reports):
+    """(peak during output, peak overall, PDF size) in bytes"""
+    gc.collect()
+    tracemalloc.start()
+    pdf = build_booklet(reports)
+    layout_current, layout_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    size = output(pdf)
+    _, output_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del pdf
+    return output_peak - layout_current, max(layout_peak, output_peak), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reports", type=int, nargs="+", default=[1, 10, 40])
+    parser.add_argument("--raster", action="store_true", help="matplotlib PNG charts (bigger PDF)")
+    args = parser.parse_args()
+    if args.raster:
+        config.CHART_IMAGES["mode"] = "raster"
+    # Fonts, imports and (raster) every chart image in the cache before measuring
+    generate_analysis_pdf(ANSWERS, ANALYSIS)
+    build_booklet(max(args.reports))
+
+    print(f"Grafici: {config.CHART_IMAGES['mode']}")
+    for reports in args.reports:
+        print(f"{reports} report")
+        for label, output in METHODS:
+            extra, peak, size = measure(output, reports)
+            print(f"  {label:22s} output +{extra / 2**20:7.2f} MB   totale {peak / 2**20:7.2f} MB"
+                  f"   PDF {size / 2**20:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Microbenchmark: keyword scoring engine vs the original per-chart heuristics
+
+The original code scored the analysis twice (Plotly dashboard and PDF
+charts), lower-casing and rescanning each section once per keyword branch.
+utils.scoring scans each section once and both consumers share the result.
+Checks that the engine matches the original dashboard rules on random
+keyword-dense texts, then times both.
+
+Usage:
+    python benchmarks/bench_scoring.py [--repeat 200] [--scale 20]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scoring import KEYWORDS, SCORED_SECTIONS, score_analysis  # noqa: E402
+
+
+# ============================================================================
+# ORIGINAL HEURISTICS (utils/visualizations.py; utils/export.py had copies)
+# ============================================================================
+
+def legacy_radar_values(analysis_results):
+    values = []
+    fatt_text = str(analysis_results.get("fattibilita_tecnica", ""))
+    fatt_match = re.search(r'(\d+(?:\.\d+)?)\s*/\s*5', fatt_text)
+    if fatt_match:
+        values.append(float(fatt_match.group(1)))
+    else:
+        if any(kw in fatt_text.lower() for kw in ["alta", "elevata", "ottima"]):
+            values.append(4.5)
+        elif any(kw in fatt_text.lower() for kw in ["media", "moderata"]):
+            values.append(3.0)
+        elif any(kw in fatt_text.lower() for kw in ["bassa", "difficile"]):
+            values.append(2.0)
+        else:
+            values.append(3.5)
+
+    costi_text = str(analysis_results.get("riduzione_costi", ""))
+    tempo_text = str(analysis_results.get("risparmio_di_tempo_stimato", ""))
+    combined = (costi_text + tempo_text).lower()
+    if any(kw in combined for kw in ["significativ", "notevole", "alto", "50%", "60%", "70%"]):
+        values.append(4.5)
+    elif any(kw in combined for kw in ["moderat", "medio", "30%", "40%"]):
+        values.append(3.5)
+    else:
+        values.append(3.0)
+
+    rischi_text = str(analysis_results.get("rischi_e_criticita", ""))
+    if any(kw in rischi_text.lower() for kw in ["alto rischio", "critico", "grave"]):
+        values.append(2.0)
+    elif any(kw in rischi_text.lower() for kw in ["medio", "moderato"]):
+        values.append(3.0)
+    elif any(kw in rischi_text.lower() for kw in ["basso", "minim", "gestibil"]):
+        values.append(4.5)
+    else:
+        values.append(3.0)
+
+    score_text = str(analysis_results.get("score_complessivo", ""))
+    score_match = re.search(r'(\d+(?:\.\d+)?)\s*/\s*10', score_text)
+    if score_match:
+        values.append(min(5.0, float(score_match.group(1)) / 2))
+    else:
+        values.append(3.5)
+
+    roadmap_text = str(analysis_results.get("roadmap_implementazione", ""))
+    formazione_text = str(analysis_results.get("formazione_necessaria", ""))
+    combined = (roadmap_text + formazione_text).lower()
+    if any(kw in combined for kw in ["semplice", "facile", "rapida", "minima"]):
+        values.append(4.5)
+    elif any(kw in combined for kw in ["complessa", "lunga", "estesa"]):
+        values.append(2.0)
+    else:
+        values.append(3.0)
+    return values
+
+
+def legacy_risk_values(analysis_results):
+    rischi_text = str(analysis_results.get("rischi_e_criticita", "")).lower()
+    privacy_text = str(analysis_results.get("problemi_legali_e_privacy", "")).lower()
+    formazione = str(analysis_results.get("formazione_necessaria", "")).lower()
+    risks = []
+    if any(kw in rischi_text for kw in ["tecnico alto", "complessita elevata"]):
+        risks.append(4)
+    elif "tecnic" in rischi_text:
+        risks.append(3)
+    else:
+        risks.append(2)
+    if any(kw in privacy_text for kw in ["gdpr", "privacy", "dati personali"]):
+        if any(kw in privacy_text for kw in ["critico", "alto"]):
+            risks.append(4)
+        else:
+            risks.append(3)
+    else:
+        risks.append(2)
+    if any(kw in rischi_text for kw in ["cambiamento", "resistenza", "organizzativ"]):
+        risks.append(3)
+    else:
+        risks.append(2)
+    if any(kw in privacy_text for kw in ["responsabilita", "legal", "compliance"]):
+        risks.append(3)
+    else:
+        risks.append(2)
+    if any(kw in rischi_text + formazione for kw in ["resistenza", "change management"]):
+        risks.append(3)
+    else:
+        risks.append(2)
+    return risks
+
+
+def legacy_process_position(analysis_results=None, answers=None):
+    if not answers:
+        return None, None
+    complexity_score = 0
+    as_is_steps = answers.get("as_is_step", "")
+    if as_is_steps:
+        complexity_score += min(len([s for s in as_is_steps.strip().split("\n") if s.strip()]), 10)
+    dati_sistemi = answers.get("to_be_dati_sistemi", "")
+    if dati_sistemi:
+        complexity_score += min(len([s for s in dati_sistemi.replace(",", "\n").split("\n") if s.strip()]), 5)
+    tools = answers.get("to_be_tool", "")
+    if tools:
+        complexity_score += min(len([t for t in tools.replace(",", "\n").split("\n") if t.strip()]), 5)
+    x = max(0.1, min(0.9, min(1.0, complexity_score / 15)))
+
+    autonomy_score = 0.5
+    if analysis_results:
+        impatto_text = str(analysis_results.get("analisi_impatto_sostituzione_vs_augmentation", "")).lower()
+        for kw in ["sostituzione", "automazione completa", "completamente automatizzato",
+                   "senza intervento", "autonomo", "sostituire"]:
+            if kw in impatto_text:
+                autonomy_score += 0.1
+        for kw in ["augmentation", "supporto", "assistenza", "affiancamento",
+                   "supervisione", "approvazione", "revisione umana"]:
+            if kw in impatto_text:
+                autonomy_score -= 0.1
+    azioni_limiti = str(answers.get("to_be_azioni_limiti", "")).lower()
+    if azioni_limiti:
+        if any(kw in azioni_limiti for kw in ["senza supervisione", "autonomamente", "automatico"]):
+            autonomy_score += 0.15
+        if any(kw in azioni_limiti for kw in ["approvazione", "conferma", "supervisione", "controllo umano"]):
+            autonomy_score -= 0.15
+    return x, max(0.1, min(0.9, autonomy_score))
+
+
+def legacy_pdf_matrix_y(analysis_results):
+    # The PDF matrix used its own, shorter keyword lists
+    autonomy_score = 0.5
+    impatto_text = str(analysis_results.get("analisi_impatto_sostituzione_vs_augmentation", "")).lower()
+    for kw in ["sostituzione", "automazione completa", "autonomo"]:
+        if kw in impatto_text:
+            autonomy_score += 0.1
+    for kw in ["augmentation", "supporto", "supervisione"]:
+        if kw in impatto_text:
+            autonomy_score -= 0.1
+    return max(0.1, min(0.9, autonomy_score))
+
+
+def legacy_dashboard_and_pdf(analysis_results, answers):
+    dashboard = (legacy_radar_values(analysis_results), legacy_risk_values(analysis_results),
+                 legacy_process_position(analysis_results, answers))
+    pdf = (legacy_radar_values(analysis_results), legacy_risk_values(analysis_results),
+           legacy_pdf_matrix_y(analysis_results))
+    return dashboard, pdf
+
+
+# ============================================================================
+# SYNTHETIC ANALYSES
+# ============================================================================
+
+FILLER_WORDS = ("il", "processo", "agente", "dati", "reparto", "controllo", "tempo", "costo",
+                "cliente", "ordine", "sistema", "fase", "valore", "team", "report")
+VOCABULARY = sorted({kw for keywords in KEYWORDS.values() for kw in keywords})
+
+
+def make_text(rng, words, keyword_rate):
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(VOCABULARY) if rng.random() < keyword_rate else rng.choice(FILLER_WORDS))
+    return " ".join(parts).capitalize() + "."
+
+
+def make_analysis(rng, words, keyword_rate=0.05):
+    sections = {section: make_text(rng, words, keyword_rate)
+                for section in SCORED_SECTIONS if not section.startswith("answer:")}
+    sections["score_complessivo"] = f"{rng.randint(1, 10)}/10 - {make_text(rng, words, keyword_rate)}"
+    answers = {
+        "as_is_step": "\n".join(f"{i}. passo" for i in range(rng.randint(1, 12))),
+        "to_be_dati_sistemi": "ERP, CRM, email",
+        "to_be_tool": "Gmail, Slack",
+        "to_be_azioni_limiti": make_text(rng, 30, 0.2),
+    }
+    return sections, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=20, help="parole per sezione x 10")
+    args = parser.parse_args()
+
+    # Equivalence with the original dashboard rules on keyword-dense texts
+    rng = random.Random(42)
+    for _ in range(500):
+        analysis, answers = make_analysis(rng, rng.randint(0, 60), keyword_rate=0.3)
+        scores = score_analysis(analysis, answers)
+        expected = (legacy_radar_values(analysis), legacy_risk_values(analysis),
+                    legacy_process_position(analysis, answers))
+        assert (scores.radar, scores.risks, scores.position) == expected, "risultato diverso dalle regole originali"
+
+    analysis, answers = make_analysis(random.Random(7), args.scale * 10)
+    size = sum(len(text) for text in analysis.values())
+    print(f"Analisi sintetica: {len(analysis)} sezioni, {size / 1024:.1f} KB")
+    for label, fn in (
+        ("originale (dashboard + PDF)", lambda: legacy_dashboard_and_pdf(analysis, answers)),
+        ("originale (solo dashboard)", lambda: (legacy_radar_values(analysis), legacy_risk_values(analysis),
+                                                legacy_process_position(analysis, answers))),
+        ("score_analysis (condiviso)", lambda: score_analysis(analysis, answers)),
+    ):
+        seconds = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+        print(f"  {label:<28} {seconds * 1e6:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
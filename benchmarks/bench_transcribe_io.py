@@ -0,0 +1,99 @@
+"""
+Benchmark: Whisper upload from a temp file vs a named in-memory buffer
+
+Times the local part of transcribe_audio (everything but the network) for
+WAV recordings of a few lengths, with a stub client that reads the upload
+like the SDK does. Disk I/O is read from /proc/self/io (Linux): bytes
+written by the process and write syscalls.
+
+Usage:
+    python benchmarks/bench_transcribe_io.py [--repeat 20] [--seconds 10 60 300]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.voice_input import audio_upload_file  # noqa: E402
+
+# audio_recorder_streamlit: 16-bit mono PCM WAV at 44.1 kHz
+BYTES_PER_SECOND = 44100 * 2
+
+
+class StubClient:
+    """client.audio.transcriptions.create that reads the whole upload"""
+
+    def __init__(self):
+        self.audio = SimpleNamespace(transcriptions=self)
+
+    def create(self, model, file, language):
+        return SimpleNamespace(text=str(len(file.read())))
+
+
+def legacy_request(client, audio_bytes):
+    """Previous path: NamedTemporaryFile, reopen for the upload, unlink"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
+        tmp_file.write(audio_bytes)
+        tmp_file_path = tmp_file.name
+    with open(tmp_file_path, "rb") as audio_file:
+        transcript = client.audio.transcriptions.create(model="whisper-1", file=audio_file, language="it")
+    os.unlink(tmp_file_path)
+    return transcript.text
+
+
+def buffer_request(client, audio_bytes):
+    transcript = client.audio.transcriptions.create(
+        model="whisper-1", file=audio_upload_file(audio_bytes), language="it")
+    return transcript.text
+
+
+def process_io():
+    """(bytes written, write syscalls) so far, None off Linux"""
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["wchar"]), int(fields["syscw"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def measure(request, audio_bytes, repeat):
+    client = StubClient()
+    request(client, audio_bytes)
+    times = []
+    io_before = process_io()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        request(client, audio_bytes)
+        times.append(time.perf_counter() - started)
+    io_after = process_io()
+    written = None
+    if io_before and io_after:
+        written = ((io_after[0] - io_before[0]) / repeat, (io_after[1] - io_before[1]) / repeat)
+    return statistics.median(times), written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seconds", type=int, nargs="+", default=[10, 60, 300])
+    args = parser.parse_args()
+
+    print(f"Temp dir: {tempfile.gettempdir()}")
+    for seconds in args.seconds:
+        audio_bytes = b"RIFF" + os.urandom(seconds * BYTES_PER_SECOND - 4)
+        print(f"{seconds}s di audio ({len(audio_bytes) / 2**20:.1f} MB)")
+        for label, request in (("file temporaneo", legacy_request), ("BytesIO", buffer_request)):
+            seconds_taken, written = measure(request, audio_bytes, args.repeat)
+            io_text = f"{written[0] / 2**20:7.2f} MB scritti, {written[1]:.0f} write" if written else "I/O n/d"
+            print(f"  {label:16s} {seconds_taken * 1000:8.3f} ms   {io_text}")
+
+
+if __name__ == "__main__":
+    main()
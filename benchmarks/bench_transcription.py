@@ -0,0 +1,118 @@
+"""
+Benchmark: one Whisper request vs chunked parallel transcription
+
+A stub Whisper returns one word per 400 ms of audio ("p0 p1 ...", by
+absolute position) and sleeps like the API: upload time on a shared
+uplink (one upload at a time) plus processing at a realtime factor. Long
+recordings are transcribed in one request and with transcribe_recording;
+the stitched text must contain every word once, in order. Recordings use the
+voice-like signal of bench_audio_encoding.py (with pauses) or continuous
+noise (--no-pauses: hard cuts with overlap).
+
+Usage:
+    python benchmarks/bench_transcription.py [--minutes 2 5 10] [--realtime-factor 15]
+        [--base-latency 0.5] [--uplink-mbps 2] [--no-pauses] [--ffmpeg PATH]
+"""
+
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from benchmarks.bench_audio_encoding import recording  # noqa: E402
+from utils.audio_encoding import AudioTooLargeError, encode_for_upload  # noqa: E402
+from utils.transcription import AudioChunk, split_recording, transcribe_recording  # noqa: E402
+
+WORD_MS = 400
+
+
+def noise_recording(seconds, sample_rate=16000):
+    rng = np.random.default_rng(1)
+    pcm = (rng.standard_normal(seconds * sample_rate) * 3000).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+class StubWhisper:
+    """transcribe_chunk stand-in with API-like latency"""
+
+    def __init__(self, duration_ms, args):
+        self.duration_ms = duration_ms
+        self.args = args
+        self.uplink = threading.Lock()  # parallel uploads share the same Wi-Fi
+
+    def __call__(self, chunk):
+        start = 0 if chunk.start_ms is None else chunk.start_ms
+        end = self.duration_ms if chunk.end_ms is None else chunk.end_ms
+        audio_seconds = (end - start) / 1000
+        upload = len(chunk.audio.data) * 8 / (self.args.uplink_mbps * 1e6)
+        with self.uplink:
+            time.sleep(upload)
+        time.sleep(self.args.base_latency + audio_seconds / self.args.realtime_factor)
+        # Words whose start falls in the chunk: an overlap repeats them in both chunks
+        first = -(-start // WORD_MS)
+        return " ".join(f"p{index}" for index in range(first, -(-end // WORD_MS)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--realtime-factor", type=float, default=15.0, help="secondi di audio per secondo di attesa")
+    parser.add_argument("--base-latency", type=float, default=0.5)
+    parser.add_argument("--uplink-mbps", type=float, default=2.0)
+    parser.add_argument("--no-pauses", action="store_true", help="rumore continuo: tagli con sovrapposizione")
+    parser.add_argument("--ffmpeg", default=None, help="ffmpeg executable (default: config/PATH)")
+    args = parser.parse_args()
+    if args.ffmpeg:
+        config.VOICE_AUDIO["ffmpeg"] = args.ffmpeg
+
+    for minutes in args.minutes:
+        seconds = int(minutes * 60)
+        audio_bytes = noise_recording(seconds) if args.no_pauses else recording(seconds, 16000, 2)
+        segment, spans = split_recording(audio_bytes)
+        stub = StubWhisper(len(segment), args)
+        cuts = len(spans) - 1
+        hard = sum(1 for (_, end), (start, _) in zip(spans, spans[1:]) if start < end)
+        print(f"{minutes:g} min ({len(audio_bytes) / 2**20:.1f} MB): {len(spans)} pezzi, "
+              f"{cuts - hard} tagli in pausa, {hard} con sovrapposizione")
+
+        started = time.perf_counter()
+        try:
+            audio = encode_for_upload(audio_bytes)
+            stub(AudioChunk(0, None, None, audio))
+            single_seconds = time.perf_counter() - started
+            print(f"  una richiesta      {single_seconds:6.1f}s  upload {len(audio.data) / 2**20:5.1f} MB ({audio.format})")
+        except AudioTooLargeError as e:
+            print(f"  una richiesta      fallita: {e}")
+
+        first_partial = []
+
+        def on_progress(done, total, text):
+            if text and not first_partial:
+                first_partial.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        transcript = transcribe_recording(audio_bytes, stub, on_progress=on_progress)
+        chunked_seconds = time.perf_counter() - started
+        expected = " ".join(f"p{index}" for index in range(-(-len(segment) // WORD_MS)))
+        status = "testo completo" if transcript.text == expected else "TESTO DIVERSO"
+        print(f"  a pezzi ({config.VOICE_TRANSCRIPTION['max_parallel']} par.)  {chunked_seconds:6.1f}s  "
+              f"upload {transcript.upload_bytes / 2**20:5.1f} MB ({transcript.format}), "
+              f"primo testo dopo {first_partial[0]:.1f}s, {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,6 +44,178 @@ APP_CONFIG = {
     "layout": "wide",
 }
 
+# Claude models, in order of accessibility (fallback order for the analysis)
+CLAUDE_MODELS = [
+    "claude-3-haiku-20240307",   # Most accessible and economical
+    "claude-3-sonnet-20240229",  # Good balance
+    "claude-3-opus-20240229",    # Most powerful but may have restrictions
+]
+
+# Prompt Budget (token stimati localmente, prima dell'invio a Claude)
+# Le risposte troppo lunghe (es. 10 minuti di dettatura) vengono compattate:
+# filler rimossi, frasi ripetute eliminate, poi riassunto inizio + fine
+PROMPT_BUDGET = {
+    "enabled": True,
+    "max_prompt_tokens": 12000,   # budget totale del prompt (template + risposte)
+    "field_max_tokens": 800,      # budget di default per ogni risposta
+    "field_overrides": {          # risposte dove serve più spazio
+        "as_is_step": 1500,
+        "to_be_agenti": 1200,
+        "to_be_flusso": 1200,
+        "to_be_system_prompt": 1500,
+        "q1_problem": 1200,
+        "q5_flow": 1200,
+    },
+}
+
+# Prompt Caching (istruzioni fisse inviate come system prompt con cache_control)
+# Le analisi ravvicinate dell'aula leggono il template dalla cache Anthropic
+# (costo ~10% e primo token più rapido). La cache vale ~5 minuti e richiede un
+# prefisso (strumenti + system) di almeno 1024 token, 2048 per Haiku: sotto
+# soglia il breakpoint non viene messo. Oggi solo V2 lo supera (V1 ~900 token)
+PROMPT_CACHING = {
+    "enabled": True,
+    "min_prefix_tokens": 2048,  # soglia di Claude Haiku, il primo modello in CLAUDE_MODELS
+}
+
+# Output strutturato (tool use): dopo l'analisi in Markdown Claude compila
+# lo strumento "registra_analisi" con score, ROI, fasi, vendor e rischi come
+# campi tipizzati. Se manca o non rispetta lo schema si usa il parser regex
+STRUCTURED_OUTPUT = {
+    "enabled": True,
+    "extra_max_tokens": 1500,     # spazio per il JSON oltre alla prosa
+}
+
+# Analysis Cache (risultati Claude riutilizzati se le risposte non cambiano)
+# Il disco usa ./data, già montato come volume in docker-compose
+ANALYSIS_CACHE = {
+    "enabled": True,
+    "disk_enabled": True,
+    "disk_dir": os.environ.get("ANALYSIS_CACHE_DIR", os.path.join("data", "analysis_cache")),
+    "memory_max_bytes": 16 * 1024 * 1024,  # 16 MB in-process LRU
+}
+
+# Transcription Cache (trascrizioni Whisper riutilizzate per la stessa registrazione)
+# Il widget restituisce gli stessi byte a ogni rerun: senza cache si pagherebbe di nuovo
+# Whisper. Il disco è opzionale (le trascrizioni restano in ./data tra un riavvio e l'altro)
+TRANSCRIPTION_CACHE = {
+    "enabled": True,
+    "disk_enabled": False,
+    "disk_dir": os.environ.get("TRANSCRIPTION_CACHE_DIR", os.path.join("data", "transcription_cache")),
+    "memory_max_bytes": 4 * 1024 * 1024,  # ~1-5 KB per trascrizione
+}
+
+# Grafici del PDF: "vector" li disegna con fpdf (nitidi, pochi KB, senza
+# matplotlib); "raster" incorpora PNG matplotlib tenuti in memoria e condivisi
+# tra le sessioni, renderizzati in background appena l'analisi è pronta.
+# Chiave = valori del grafico (stessi valori = stessa immagine)
+CHART_IMAGES = {
+    "mode": "vector",                      # "vector" | "raster"
+    "enabled": True,                       # cache dei PNG (modalità raster)
+    "warmup": True,                        # render in background a fine analisi
+    "memory_max_bytes": 8 * 1024 * 1024,   # ~60-80 KB per grafico
+}
+
+# Font del PDF: Unicode TrueType incorporato (solo i glifi usati), così
+# accenti e simboli restano ("Fattibilità", "€", "→"). I file si cercano in
+# "dir" (PDF_FONT_DIR, di default i DejaVu distribuiti in assets/fonts), poi
+# tra i DejaVu di matplotlib se installato; senza file si torna a Helvetica
+# (latin-1, senza accenti)
+PDF_FONT = {
+    "unicode": True,
+    "family": "DejaVu",
+    "dir": os.environ.get("PDF_FONT_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "fonts"),
+    "files": {
+        "": "DejaVuSans.ttf",
+        "B": "DejaVuSans-Bold.ttf",
+        "I": "DejaVuSans-Oblique.ttf",
+    },
+}
+
+# Hedged Requests (fallback parallelo tra modelli Claude)
+# Il modello successivo parte se il primo non inizia a rispondere entro hedge_delay
+# secondi o appena restituisce errore; vince il primo che risponde
+HEDGING = {
+    "enabled": True,
+    "hedge_delay": 6.0,       # secondi di attesa del primo token prima del fallback
+    "max_parallel": 2,        # tentativi contemporanei al massimo
+    "adaptive_order": True,   # riordina i modelli in base a latenza ed errori misurati
+}
+
+# Anthropic Client (condiviso tra tutte le sessioni, uno per API key)
+ANTHROPIC_CLIENT = {
+    "max_connections": 50,            # connessioni HTTP totali nel pool
+    "max_keepalive_connections": 20,  # connessioni tenute aperte tra una chiamata e l'altra
+    "keepalive_expiry": 60.0,         # secondi prima di chiudere una connessione inattiva
+    "connect_timeout": 10.0,
+    "read_timeout": 120.0,            # risposte da 4000 token possono richiedere ~1 minuto
+    "max_retries": 0,                 # retry su 429/529 gestiti da RATE_LIMITS
+}
+
+# OpenAI Client per Whisper (condiviso tra tutte le sessioni, uno per API key)
+OPENAI_CLIENT = {
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 60.0,
+    "connect_timeout": 10.0,
+    "read_timeout": 120.0,            # upload e trascrizione di registrazioni lunghe
+    "max_retries": 0,                 # retry su 429 gestiti da RATE_LIMITS
+}
+
+# Audio per Whisper: registrato a 16 kHz, ridotto a mono e compresso prima
+# dell'upload (MP3, poi Opus, con ffmpeg; senza ffmpeg WAV 16 kHz mono).
+# MP3 prima: ~6x più veloce da codificare di Opus, file solo ~1.4x più grande
+# (benchmarks/bench_audio_encoding.py)
+VOICE_AUDIO = {
+    "record_sample_rate": 16000,      # chiesto al browser (None = default, di solito 48 kHz)
+    "compress": True,
+    "sample_rate": 16000,             # Whisper lavora a 16 kHz mono
+    "ffmpeg": os.environ.get("FFMPEG_BINARY", "ffmpeg"),
+    "encoders": [                     # in ordine di preferenza; bitrate più bassi solo oltre il budget
+        {"format": "mp3", "codec": "libmp3lame", "bitrates": ["32k", "16k"]},
+        {"format": "ogg", "codec": "libopus", "bitrates": ["24k", "12k"]},
+    ],
+    "encode_timeout": 60.0,           # secondi
+    "max_upload_bytes": 24 * 1024 * 1024,  # limite Whisper: 25 MB per file
+}
+
+# Registrazioni lunghe: tagliate nelle pause in pezzi da ~1 minuto, trascritti
+# in parallelo (sempre dentro RATE_LIMITS["openai"]) e ricuciti in ordine
+VOICE_TRANSCRIPTION = {
+    "min_split_seconds": 90,     # fino a questa durata una sola richiesta
+    "chunk_seconds": 60,         # durata obiettivo di un pezzo
+    "search_seconds": 10,        # finestra attorno al taglio in cui cercare una pausa
+    "min_pause_ms": 300,         # durata minima di una pausa
+    "silence_db": -16,           # pausa = sotto il livello medio di 16 dB
+    "overlap_seconds": 2.0,      # sovrapposizione quando il taglio cade nel parlato
+    "max_parallel": 4,           # richieste contemporanee per registrazione
+}
+
+# Analysis Jobs (analisi AI in background, sopravvivono a rerun e cambi di tab)
+ANALYSIS_JOBS = {
+    "max_workers": 4,       # analisi contemporanee per processo
+    "job_ttl": 3600,        # secondi di conservazione dei risultati completati
+    "poll_interval": 1.0,   # secondi tra un aggiornamento della pagina e l'altro
+}
+
+# Rate Limits (condivisi da tutta l'aula, per processo)
+# Code eque per sessione; su 429/529 si riprova con backoff sullo stesso modello
+RATE_LIMITS = {
+    "anthropic": {
+        "requests_per_minute": 50,
+        "tokens_per_minute": 80000,   # prompt stimato + max_tokens di risposta
+        "max_concurrent": 8,
+    },
+    "openai": {
+        "requests_per_minute": 50,
+        "tokens_per_minute": None,
+        "max_concurrent": 8,
+    },
+    "max_retries": 4,
+    "backoff_base": 1.0,   # secondi, raddoppia a ogni tentativo (con jitter)
+    "backoff_max": 30.0,
+}
+
 # Agentic Flow Templates
 AGENTIC_FLOW_TEMPLATES = [
     {
@@ -0,0 +1,78 @@
+"""
+Bulk PDF export of analyzed workshop projects (headless, no Streamlit)
+
+Renders one PDF report per agentic_ai_project_*.json in a directory (the
+same report as "Scarica PDF" in the app), in parallel worker processes,
+and optionally one booklet with every project and a table of contents.
+Run batch_analyze.py first for projects without an analysis.
+
+Usage:
+    python export_pdfs.py exports/                      # PDF in exports/pdf/
+    python export_pdfs.py exports/ --booklet --workers 4 --output report/
+    python export_pdfs.py exports/ --raster             # grafici matplotlib invece che vettoriali
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import config
+from utils.batch import find_exports
+from utils.bulk_export import export_pdfs, load_pdf_items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export PDF in batch dei progetti analizzati")
+    parser.add_argument("directory", help="cartella con i file JSON esportati e analizzati")
+    parser.add_argument("--output", default=None, help="cartella dei PDF (default: <directory>/pdf)")
+    parser.add_argument("--workers", type=int, default=None, help="processi paralleli (default: numero di CPU)")
+    parser.add_argument("--booklet", action="store_true", help="crea anche un unico PDF con indice")
+    parser.add_argument("--raster", action="store_true", help="grafici PNG matplotlib invece che vettoriali")
+    parser.add_argument("--core-fonts", action="store_true", help="Helvetica (senza accenti) invece del font Unicode")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        sys.exit(f"Cartella non trovata: {args.directory}")
+    if args.raster:
+        config.CHART_IMAGES["mode"] = "raster"
+    if args.core_fonts:
+        config.PDF_FONT["unicode"] = False
+    output_dir = args.output or os.path.join(args.directory, "pdf")
+
+    items, skipped = load_pdf_items(find_exports(args.directory))
+    for path, reason in skipped:
+        print(f"- {os.path.basename(path)}: saltato ({reason})")
+    if not items:
+        print("Nessun progetto da esportare.")
+        return 0
+
+    total = len(items) + (1 if args.booklet else 0)
+    print(f"Export di {len(items)} progetti in {output_dir} ({args.workers or os.cpu_count()} processi)...")
+    start = time.time()
+    done = [0]
+
+    def on_done(name, result, error):
+        done[0] += 1
+        if error is not None:
+            print(f"[{done[0]}/{total}] {name}: ERRORE: {error}")
+        else:
+            print(f"[{done[0]}/{total}] {result['name']} -> {os.path.basename(result['output'])}: "
+                  f"{result['seconds']:.2f}s, {result['bytes'] / 1024:.0f} KB")
+
+    try:
+        summary = export_pdfs(items, output_dir, workers=args.workers, booklet=args.booklet, on_done=on_done)
+    except KeyboardInterrupt:
+        print(f"\nInterrotto dopo {done[0]} file.")
+        return 130
+
+    elapsed = time.time() - start
+    render_seconds = sum(result["seconds"] for result in summary["rendered"])
+    print(f"\nCompletati: {len(summary['rendered'])}, errori: {len(summary['failed'])}, "
+          f"saltati: {len(skipped)} in {elapsed:.1f}s "
+          f"(somma dei tempi per file {render_seconds:.1f}s, x{render_seconds / elapsed:.1f} in parallelo)")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Content-addressed cache for Claude analysis results
+Key = hash(normalized answers, prompt template version, model)
+"""
+
+import copy
+import threading
+import config
+from utils.cache import TieredCache, stable_hash
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """Process-wide analysis cache (shared by all Streamlit sessions)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = config.ANALYSIS_CACHE
+            _cache = TieredCache(
+                max_memory_bytes=settings["memory_max_bytes"],
+                disk_dir=settings["disk_dir"] if settings.get("disk_enabled", True) else None
+            )
+        return _cache
+
+
+def normalize_answers(answers):
+    """Normalize answers so cosmetic differences (whitespace, empty fields) share a key"""
+    if isinstance(answers, dict):
+        normalized = {}
+        for key, value in answers.items():
+            value = normalize_answers(value)
+            if value in ("", None, [], {}):
+                continue
+            normalized[str(key)] = value
+        return normalized
+    if isinstance(answers, (list, tuple)):
+        return [normalize_answers(v) for v in answers]
+    if isinstance(answers, str):
+        lines = [line.rstrip() for line in answers.strip().replace("\r\n", "\n").split("\n")]
+        return "\n".join(lines)
+    return answers
+
+
+def analysis_cache_key(namespace, answers, prompt_version, model):
+    """Cache key for one (answers, prompt template, model) combination"""
+    return stable_hash(namespace, prompt_version, model, normalize_answers(answers))
+
+
+def get_cached_analysis(namespace, answers, prompt_version, models):
+    """
+    Look up a cached analysis for any of the given models (in order)
+
+    Returns:
+        tuple: (analysis_results, model_name) or (None, None)
+    """
+    if not config.ANALYSIS_CACHE.get("enabled", True):
+        return None, None
+
+    cache = get_analysis_cache()
+    for model_name in models:
+        cached = cache.get(analysis_cache_key(namespace, answers, prompt_version, model_name))
+        if cached is not None:
+            # Copy so callers can't mutate the cached entry
+            return copy.deepcopy(cached), model_name
+    return None, None
+
+
+def store_cached_analysis(namespace, answers, prompt_version, model, analysis_results):
+    """Store an analysis result for later identical requests"""
+    if not config.ANALYSIS_CACHE.get("enabled", True) or not analysis_results:
+        return
+    cache = get_analysis_cache()
+    cache.set(analysis_cache_key(namespace, answers, prompt_version, model), copy.deepcopy(analysis_results))
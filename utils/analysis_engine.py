@@ -0,0 +1,311 @@
+"""
+Pure analysis engine (no Streamlit)
+Prompt building, cache lookup, hedged model fallback and parsing for the
+V1 and V2 analyses, with structured results/errors and an event hook for
+progress. Used directly by background jobs, the batch CLI and benchmarks;
+ai_analysis / ai_analysis_v2 are thin Streamlit adapters on top.
+"""
+
+import json
+import time
+
+import config
+from utils.analysis_cache import get_cached_analysis, store_cached_analysis
+from utils.analysis_prompts import (
+    ANALYSIS_INSTRUCTIONS,
+    PROMPT_VERSION,
+    build_analysis_prompt,
+    match_section_header,
+    parse_analysis_response,
+)
+from utils.clients import get_anthropic_client
+from utils.hedging import HedgedRequestError, hedged_message_text
+from utils.stream_parser import SectionStreamParser
+from utils.structured_output import STRUCTURED_OUTPUT_NOTE, V1_TOOL, V2_TOOL, find_tool_input, validate
+from utils.token_budget import estimate_tokens, fit_prompt, prompt_metrics, usage_metrics
+from utils_v2.analysis_prompts_v2 import (
+    ANALYSIS_INSTRUCTIONS_V2,
+    PROMPT_VERSION_V2,
+    build_analysis_prompt_v2,
+    calculate_roi_breakdown,
+    match_layer_header,
+    merge_structured_v2,
+    parse_analysis_v2,
+)
+
+# AnalysisError kinds
+MISSING_API_KEY = "missing_api_key"
+ALL_MODELS_FAILED = "all_models_failed"
+REQUEST_FAILED = "request_failed"      # unexpected error (client setup, parsing, ...)
+
+# Events passed to on_event(event, data), always from the calling thread
+EVENT_CACHE_HIT = "cache_hit"          # {"model"}
+EVENT_PROMPT_BUDGET = "prompt_budget"  # {"report"} - estimated prompt tokens, compacted fields
+EVENT_STARTED = "started"              # {"models"}
+EVENT_SECTION = "section"              # {"key", "content"} - streamed section/layer completed
+EVENT_MODEL_FAILED = "model_failed"    # {"model", "error"}
+EVENT_STRUCTURED = "structured"        # {"valid", "errors"} - tool input checked against the schema
+EVENT_COMPLETED = "completed"          # {"result"}
+
+
+class AnalysisSpec:
+    """How one analysis flavour (V1 / V2) is prompted, streamed and parsed"""
+
+    def __init__(self, namespace, prompt_version, instructions, build_prompt, parse, match_header,
+                 initial_key="introduction", keep_blank_lines=False, max_tokens=4000, temperature=0.7,
+                 tool=None):
+        self.namespace = namespace
+        self.prompt_version = prompt_version
+        self.instructions = instructions  # static system prompt (cacheable prefix)
+        self.build_prompt = build_prompt
+        self._parse = parse
+        self.match_header = match_header
+        self.initial_key = initial_key
+        self.keep_blank_lines = keep_blank_lines
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.tool = tool  # structured output tool (utils.structured_output), None = prose only
+
+    @property
+    def structured(self):
+        return self.tool is not None and config.STRUCTURED_OUTPUT.get("enabled", True)
+
+    @property
+    def cache_version(self):
+        """Prompt version for the analysis cache key: prose-only and structured results differ"""
+        return f"{self.prompt_version}+structured" if self.structured else self.prompt_version
+
+    def prepare_request(self, answers):
+        """
+        Messages API parameters (without model), answers compacted to the token budget
+
+        The static instructions go first as system prompt, marked for prompt
+        caching when the prefix (tools + system) reaches the model minimum;
+        only the user message with the answers changes per request.
+        In structured mode the analysis tool is offered too (tool_choice
+        auto: the prose still streams first, the tool call comes last).
+
+        Returns:
+            tuple: (message_kwargs, budget report from utils.token_budget.fit_prompt)
+        """
+        instructions = self.instructions
+        max_tokens = self.max_tokens
+        if self.structured:
+            instructions += STRUCTURED_OUTPUT_NOTE
+            max_tokens += config.STRUCTURED_OUTPUT.get("extra_max_tokens", 1500)
+
+        prompt, report = fit_prompt(answers, self.build_prompt, fixed_tokens=estimate_tokens(instructions))
+        system = instructions
+        if self.cacheable_prefix(instructions):
+            system = [{
+                "type": "text",
+                "text": instructions,
+                "cache_control": {"type": "ephemeral"}
+            }]
+        message_kwargs = dict(
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+            system=system,
+            messages=[{
+                "role": "user",
+                "content": prompt
+            }]
+        )
+        if self.structured:
+            message_kwargs["tools"] = [self.tool]
+            message_kwargs["tool_choice"] = {"type": "auto"}
+        return message_kwargs, report
+
+    def cacheable_prefix(self, instructions):
+        """
+        True if the prompt caching breakpoint is worth sending
+
+        Anthropic ignores breakpoints on prefixes below the model minimum
+        (config.PROMPT_CACHING["min_prefix_tokens"]); the prefix is the tool
+        definitions plus the system prompt.
+        """
+        settings = config.PROMPT_CACHING
+        if not settings.get("enabled", True):
+            return False
+        prefix = estimate_tokens(instructions)
+        if self.structured:
+            prefix += estimate_tokens(json.dumps(self.tool, ensure_ascii=False))
+        return prefix >= settings.get("min_prefix_tokens", 1024)
+
+    def message_kwargs(self, answers):
+        return self.prepare_request(answers)[0]
+
+    def stream_parser(self):
+        return SectionStreamParser(self.match_header, initial_key=self.initial_key,
+                                   keep_blank_lines=self.keep_blank_lines)
+
+    def structured_input(self, tool_calls):
+        """
+        Validated input of the analysis tool
+
+        Returns:
+            tuple: (data or None, list of validation errors)
+        """
+        if self.tool is None:
+            return None, []
+        data = find_tool_input(tool_calls, self.tool["name"])
+        if data is None:
+            return None, ["strumento non chiamato"]
+        errors = validate(data, self.tool["input_schema"])
+        return (None if errors else data), errors
+
+    def parse(self, answers, analysis_text, model_name, structured=None):
+        """Sections from the prose; typed fields from structured (if valid) replace the scraped ones"""
+        return self._parse(answers, analysis_text, model_name, structured)
+
+
+def _parse_v1(answers, analysis_text, model_name, structured=None):
+    sections = parse_analysis_response(analysis_text)
+    if structured:
+        sections["structured"] = structured
+    return sections
+
+
+def _parse_v2(answers, analysis_text, model_name, structured=None):
+    parsed = parse_analysis_v2(analysis_text)
+    if structured:
+        merge_structured_v2(parsed, structured)
+    # Arricchisci con calcoli numerici
+    parsed["roi_detailed"] = calculate_roi_breakdown(answers, parsed)
+    parsed["model_used"] = model_name
+    return parsed
+
+
+ANALYSIS_SPECS = {
+    "v1": AnalysisSpec("v1", PROMPT_VERSION, ANALYSIS_INSTRUCTIONS, build_analysis_prompt, _parse_v1,
+                       match_section_header, tool=V1_TOOL),
+    "v2": AnalysisSpec("v2", PROMPT_VERSION_V2, ANALYSIS_INSTRUCTIONS_V2, build_analysis_prompt_v2, _parse_v2,
+                       match_layer_header, initial_key="intro", keep_blank_lines=True, tool=V2_TOOL),
+}
+
+
+class AnalysisResult:
+    """Successful analysis: parsed sections plus how they were obtained"""
+
+    def __init__(self, sections, model, from_cache=False, failed_models=None, duration=0.0, text=None,
+                 prompt_report=None, usage=None, structured_errors=None):
+        self.sections = sections
+        self.model = model
+        self.from_cache = from_cache
+        self.failed_models = failed_models or []  # list of (model_name, error message)
+        self.duration = duration
+        self.text = text  # raw response (None when served from cache)
+        self.prompt_report = prompt_report  # token budget report (None when served from cache)
+        self.usage = usage  # billed tokens incl. prompt-cache reads/writes (None if unknown)
+        self.structured_errors = structured_errors or []  # why the regex fallback was used
+
+
+class AnalysisError(Exception):
+    """Analysis could not be produced (kind is one of the error kinds above)"""
+
+    def __init__(self, kind, message, errors=None):
+        super().__init__(message)
+        self.kind = kind
+        self.errors = errors or []  # list of (model_name, exception)
+
+    @property
+    def last_error(self):
+        return self.errors[-1][1] if self.errors else None
+
+
+def run_analysis(answers, version="v1", api_key=None, client=None, models=None, on_event=None,
+                 session_id="default", use_cache=True):
+    """
+    Run one analysis end to end
+
+    Args:
+        answers: Dict of user answers
+        version: "v1" or "v2" (key of ANALYSIS_SPECS)
+        api_key: Anthropic API key (ignored if client is given)
+        client: Optional Anthropic client (default: shared pooled client)
+        models: Fallback order (default: config.CLAUDE_MODELS)
+        on_event: Optional callback(event, data), see EVENT_* constants
+        session_id: Caller session, for the fair rate-limit queue
+        use_cache: Look up / store the result in the analysis cache
+
+    Returns:
+        AnalysisResult
+
+    Raises:
+        AnalysisError: missing API key or every model failed
+    """
+    spec = ANALYSIS_SPECS[version]
+    models = list(models or config.CLAUDE_MODELS)
+
+    def emit(event, **data):
+        if on_event:
+            on_event(event, data)
+
+    start = time.monotonic()
+
+    # Identical answers -> reuse the previous analysis without calling the API
+    if use_cache:
+        cached, cached_model = get_cached_analysis(spec.namespace, answers, spec.cache_version, models)
+        if cached:
+            result = AnalysisResult(cached, cached_model, from_cache=True, duration=time.monotonic() - start)
+            emit(EVENT_CACHE_HIT, model=cached_model)
+            emit(EVENT_COMPLETED, result=result)
+            return result
+
+    if client is None and not api_key:
+        raise AnalysisError(MISSING_API_KEY, "API Key Anthropic non configurata")
+
+    message_kwargs, prompt_report = spec.prepare_request(answers)
+    prompt_metrics.record(prompt_report)
+    emit(EVENT_PROMPT_BUDGET, report=prompt_report)
+
+    emit(EVENT_STARTED, models=models)
+    try:
+        if client is None:
+            client = get_anthropic_client(api_key)
+        analysis_text, model_name, failed, usage, tool_calls = hedged_message_text(
+            client,
+            models,
+            message_kwargs,
+            on_section=(lambda key, content: emit(EVENT_SECTION, key=key, content=content)) if on_event else None,
+            parser_factory=spec.stream_parser,
+            session_id=session_id,
+        )
+    except HedgedRequestError as e:
+        raise AnalysisError(ALL_MODELS_FAILED, str(e), e.errors) from e
+    except Exception as e:
+        raise AnalysisError(REQUEST_FAILED, str(e)) from e
+
+    usage_metrics.record(usage)
+    for failed_model, error in failed:
+        emit(EVENT_MODEL_FAILED, model=failed_model, error=str(error))
+
+    structured, structured_errors = None, []
+    if spec.structured:
+        structured, structured_errors = spec.structured_input(tool_calls)
+        emit(EVENT_STRUCTURED, valid=structured is not None, errors=structured_errors)
+
+    try:
+        sections = spec.parse(answers, analysis_text, model_name, structured)
+    except Exception as e:
+        raise AnalysisError(REQUEST_FAILED, f"Risposta non interpretabile: {e}") from e
+    if use_cache:
+        store_cached_analysis(spec.namespace, answers, spec.cache_version, model_name, sections)
+
+    result = AnalysisResult(
+        sections,
+        model_name,
+        failed_models=[(m, str(e)) for m, e in failed],
+        duration=time.monotonic() - start,
+        text=analysis_text,
+        prompt_report=prompt_report,
+        usage=usage,
+        structured_errors=structured_errors,
+    )
+    emit(EVENT_COMPLETED, result=result)
+    return result
+
+
+def estimate_prompt(answers, version="v1"):
+    """Token budget report for the prompt these answers would produce (no API call)"""
+    return ANALYSIS_SPECS[version].prepare_request(answers)[1]
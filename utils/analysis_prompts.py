@@ -0,0 +1,271 @@
+"""
+Prompt building and response parsing for the V1 analysis
+Pure functions (no Streamlit), shared by the app and the batch CLI
+"""
+
+import re
+from collections import namedtuple
+
+from utils.structured_output import structured_value
+
+# Bump when the instructions or build_analysis_prompt change, so cached analyses are not reused
+PROMPT_VERSION = "1.2"
+
+# Static instructions, identical for every participant, sent as system prompt.
+# Too short for prompt caching on Haiku (see config.PROMPT_CACHING)
+ANALYSIS_INSTRUCTIONS = """Sei un esperto consulente in trasformazione digitale e Agentic AI.
+Devi analizzare un progetto di reimplementazione di un processo aziendale con l'AI.
+I dati del progetto (processo AS-IS e TO-BE) sono nel messaggio dell'utente.
+
+# COMPITO
+
+Fornisci un'analisi approfondita e strutturata del progetto, seguendo ESATTAMENTE questo formato con i titoli indicati:
+
+## FATTIBILITÀ TECNICA
+[Valuta la fattibilità tecnica del progetto su scala 1-5 e spiega. Considera: complessità tecnica, disponibilità di dati, integrazioni necessarie, maturità delle tecnologie]
+
+## ANALISI IMPATTO: SOSTITUZIONE VS AUGMENTATION
+[Analizza se il progetto è orientato alla sostituzione completa del lavoro umano o all'augmentation (supporto). Considera: complessità del task, necessità di giudizio umano, rischio errori AI, impatto sul cliente, margine di errore ammesso. Fornisci una chiara raccomandazione.]
+
+## RISPARMIO DI TEMPO STIMATO
+[Calcola il risparmio di tempo confrontando AS-IS e TO-BE, se possibile. Fornisci stime percentuali o quantitative.]
+
+## RIDUZIONE COSTI
+[Analizza quali costi potrebbero essere ridotti: personale, errori, ritardi, inefficienze]
+
+## ATTIVITÀ ELIMINATE O OTTIMIZZATE
+[Elenca le specifiche attività che verranno eliminate o significativamente velocizzate]
+
+## RISCHI E CRITICITÀ
+[Identifica i principali rischi: tecnici, organizzativi, legali, privacy/GDPR, resistenza al cambiamento. Valuta la gravità di ciascuno.]
+
+## FORMAZIONE NECESSARIA
+[Specifica che tipo di formazione sarà necessaria per chi utilizzerà il sistema e per chi lo gestirà]
+
+## PROBLEMI LEGALI E PRIVACY
+[Analizza aspetti GDPR, privacy, responsabilità legale, audit trail, compliance]
+
+## ROADMAP IMPLEMENTAZIONE
+[Suggerisci se partire con un pilota, un MVP, o implementazione completa. Definisci fasi consigliate.]
+
+## DIAGRAMMA FLUSSO AGENTICO
+[Genera un diagramma Mermaid del flusso agentico proposto. Usa la sintassi Mermaid flowchart con:
+- Nodi per gli agenti AI
+- Nodi per le decisioni e azioni autonome
+- Frecce per il flusso
+- Colori per distinguere agenti, umani, sistemi esterni
+Esempio formato:
+```mermaid
+flowchart TD
+    A[Utente Input] --> B[Agente 1: Analisi]
+    B --> C{Decisione AI}
+    C -->|Autonomo| D[Azione Automatica]
+    C -->|Escalation| E[Review Umano]
+```
+]
+
+## RACCOMANDAZIONI FINALI
+[Fornisci 3-5 raccomandazioni chiave e concrete per il successo del progetto]
+
+## SCORE COMPLESSIVO
+[Assegna uno score finale al progetto su scala 1-10 considerando: fattibilità, impatto, rischi, costi/benefici. Spiega il punteggio.]
+
+Rispondi in italiano, in modo professionale ma accessibile. Usa esempi concreti quando possibile."""
+
+def build_analysis_prompt(answers):
+    """Build the variable part of the prompt (project data); the fixed instructions are ANALYSIS_INSTRUCTIONS"""
+
+    # Extract AS-IS information
+    as_is_processo = answers.get("as_is_processo", "Non specificato")
+    as_is_step = answers.get("as_is_step", "Non specificato")
+    as_is_problemi = answers.get("as_is_problemi", "Non specificato")
+
+    # Extract TO-BE information
+    to_be_visione = answers.get("to_be_visione", "Non specificato")
+    to_be_agenti = answers.get("to_be_agenti", "Non specificato")
+    to_be_azioni_limiti = answers.get("to_be_azioni_limiti", "Non specificato")
+    to_be_benefici = answers.get("to_be_benefici", "Non specificato")
+    to_be_rischi = answers.get("to_be_rischi", "Non specificato")
+
+    prompt = f"""# PROCESSO AS-IS (Situazione Attuale)
+
+**Processo:** {as_is_processo}
+
+**Step del processo:**
+{as_is_step}
+
+**Problemi e criticità:**
+{as_is_problemi}
+
+**Strumenti attuali:** {answers.get("as_is_strumenti", "Non specificato")}
+
+**Tempo stimato AS-IS:** {answers.get("as_is_tempo", "Non specificato")}
+
+---
+
+# PROCESSO TO-BE (Con Agentic AI)
+
+**Visione:** {to_be_visione}
+
+**Agenti AI previsti:**
+{to_be_agenti}
+
+**Azioni autonome e limiti:**
+{to_be_azioni_limiti}
+
+**Dati e sistemi:**
+{answers.get("to_be_dati_sistemi", "Non specificato")}
+
+**Tool da integrare:**
+{answers.get("to_be_tool", "Non specificato")}
+
+**Flusso agentico:**
+{answers.get("to_be_flusso", "Non specificato")}
+
+**Benefici previsti:**
+{to_be_benefici}
+
+**Rischi identificati:**
+{to_be_rischi}
+
+**Soluzioni esistenti:**
+{answers.get("to_be_soluzioni", "Non specificato")}
+
+**System Prompt:**
+{answers.get("to_be_system_prompt", "Non specificato")}
+
+---
+
+Analizza il progetto seguendo ESATTAMENTE il formato indicato nelle istruzioni."""
+
+    return prompt
+
+# Section markers expected in Claude's response (same order as the prompt)
+SECTION_MARKERS = [
+    "FATTIBILITÀ TECNICA",
+    "ANALISI IMPATTO: SOSTITUZIONE VS AUGMENTATION",
+    "RISPARMIO DI TEMPO STIMATO",
+    "RIDUZIONE COSTI",
+    "ATTIVITÀ ELIMINATE O OTTIMIZZATE",
+    "RISCHI E CRITICITÀ",
+    "FORMAZIONE NECESSARIA",
+    "PROBLEMI LEGALI E PRIVACY",
+    "ROADMAP IMPLEMENTAZIONE",
+    "DIAGRAMMA FLUSSO AGENTICO",
+    "RACCOMANDAZIONI FINALI",
+    "SCORE COMPLESSIVO"
+]
+
+# Accent-free keys computed once ("FATTIBILITÀ TECNICA" -> "fattibilita_tecnica")
+_ACCENT_TABLE = str.maketrans({
+    'à': 'a', 'è': 'e', 'é': 'e', 'ì': 'i', 'ò': 'o', 'ù': 'u',
+    'á': 'a', 'í': 'i', 'ó': 'o', 'ú': 'u'
+})
+SECTION_KEYS = {
+    marker: marker.lower().replace(' ', '_').replace(':', '').translate(_ACCENT_TABLE)
+    for marker in SECTION_MARKERS
+}
+
+# Header line: starts with '#' and contains one of the markers (one alternation for all).
+# No '^'/MULTILINE: the literal '#' prefix lets re skip ahead quickly, the
+# line-start check is done in locate_sections
+SECTION_HEADER_PATTERN = re.compile(
+    r'#[^\n]*?(?:' + '|'.join(re.escape(marker) for marker in SECTION_MARKERS) + r')[^\n]*'
+)
+# Whitespace-only lines (dropped from section content)
+_BLANK_LINE_PATTERN = re.compile(r'\n[^\S\n]*(?=\n)')
+
+# Offsets of one section in the response text (for highlighting)
+SectionSpan = namedtuple("SectionSpan", ["key", "header_start", "content_start", "end"])
+
+def _header_key(header_line):
+    # First marker in prompt order, as the original line-by-line parser did
+    for marker in SECTION_MARKERS:
+        if marker in header_line:
+            return SECTION_KEYS[marker]
+    return None
+
+def match_section_header(line):
+    """Return the normalized section key if line is a section header, else None"""
+    if not SECTION_HEADER_PATTERN.match(line):
+        return None
+    return _header_key(line)
+
+def locate_sections(analysis_text):
+    """
+    Single pass over the response: one SectionSpan per section, in order
+
+    Text before the first header is the "introduction" span (header_start
+    == content_start). Offsets are character indices into analysis_text.
+    """
+    spans = []
+    key, header_start, content_start = "introduction", 0, 0
+    for match in SECTION_HEADER_PATTERN.finditer(analysis_text):
+        if match.start() and analysis_text[match.start() - 1] != '\n':
+            continue  # '#' in the middle of a line
+        spans.append(SectionSpan(key, header_start, content_start, match.start()))
+        key, header_start, content_start = _header_key(match.group(0)), match.start(), match.end()
+    spans.append(SectionSpan(key, header_start, content_start, len(analysis_text)))
+    return spans
+
+def parse_analysis_response(analysis_text):
+    """Parse Claude's response into structured sections"""
+
+    sections = {}
+    for span in locate_sections(analysis_text):
+        # Keep non-empty lines only (same output as the original line-by-line parser)
+        content = _BLANK_LINE_PATTERN.sub('', analysis_text[span.content_start:span.end]).strip()
+        if content:
+            sections[span.key] = content
+
+    return sections
+
+def extract_score(analysis_results):
+    """Extract numerical score from analysis"""
+
+    # Structured output: typed value, no scraping
+    score = structured_value(analysis_results, "score")
+    if score is not None:
+        return score
+
+    score_section = analysis_results.get("score_complessivo", "")
+
+    # Try to find score like "8/10" or "Score: 8"
+    # Pattern 1: "X/10"
+    match = re.search(r'(\d+)/10', score_section)
+    if match:
+        return int(match.group(1))
+
+    # Pattern 2: "Score: X" or "Punteggio: X"
+    match = re.search(r'(?:Score|Punteggio):\s*(\d+)', score_section, re.IGNORECASE)
+    if match:
+        return int(match.group(1))
+
+    # Pattern 3: Just a number at the start
+    match = re.search(r'^(\d+)', score_section.strip())
+    if match:
+        score = int(match.group(1))
+        if 1 <= score <= 10:
+            return score
+
+    return None
+
+def get_feasibility_level(analysis_results):
+    """Extract feasibility level from analysis"""
+
+    level = structured_value(analysis_results, "feasibility")
+    if level is not None:
+        return level
+
+    feasibility_section = analysis_results.get("fattibilita_tecnica", "")
+
+    # Look for patterns like "3/5" or "Level 3"
+    match = re.search(r'(\d+)/5', feasibility_section)
+    if match:
+        return int(match.group(1))
+
+    match = re.search(r'(?:Level|Livello):\s*(\d+)', feasibility_section, re.IGNORECASE)
+    if match:
+        return int(match.group(1))
+
+    return None
@@ -0,0 +1,148 @@
+"""
+Audio encoding before the Whisper upload
+The recorder returns 16-bit PCM WAV: at the browser default (48 kHz
+stereo) ~11 MB per minute, uploaded over the venue Wi-Fi. Whisper works
+at 16 kHz mono, so the recording is downmixed and resampled in memory
+(pydub) and, if ffmpeg is installed, encoded to MP3 or Opus through pipes
+(no temp files, unlike AudioSegment.export). Without ffmpeg the 16 kHz
+mono WAV is uploaded. The result must fit config.VOICE_AUDIO's size budget.
+Pure module (no Streamlit).
+"""
+
+import io
+import shutil
+import subprocess
+import warnings
+import wave
+from collections import namedtuple
+
+import config
+
+AUDIO_BASENAME = "recording"
+
+EncodedAudio = namedtuple("EncodedAudio", ["data", "filename", "format", "original_bytes"])
+
+
+class AudioTooLargeError(ValueError):
+    """The recording does not fit the upload budget even after compression"""
+
+
+def ffmpeg_binary(settings=None):
+    """Path of the ffmpeg executable, None if not installed"""
+    settings = settings or config.VOICE_AUDIO
+    return shutil.which(settings["ffmpeg"]) if settings.get("ffmpeg") else None
+
+
+def speech_segment(audio_bytes, sample_rate):
+    """WAV bytes as a 16-bit mono pydub AudioSegment at sample_rate (decoded in memory)"""
+    with warnings.catch_warnings():
+        # pydub warns at import when ffmpeg is missing: WAV decoding does not need it
+        warnings.simplefilter("ignore", RuntimeWarning)
+        from pydub import AudioSegment
+
+    segment = AudioSegment.from_wav(io.BytesIO(audio_bytes))
+    return segment.set_channels(1).set_frame_rate(sample_rate).set_sample_width(2)
+
+
+def wav_bytes(segment):
+    """PCM WAV of a pydub segment"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(segment.channels)
+        wav.setsampwidth(segment.sample_width)
+        wav.setframerate(segment.frame_rate)
+        wav.writeframes(segment.raw_data)
+    return buffer.getvalue()
+
+
+def ffmpeg_encode(segment, encoder, bitrate, ffmpeg, timeout):
+    """Encoded bytes of segment (raw PCM in, container out, both through pipes), None on failure"""
+    command = [
+        ffmpeg, "-hide_banner", "-loglevel", "error",
+        "-f", "s16le", "-ar", str(segment.frame_rate), "-ac", "1", "-i", "pipe:0",
+        "-c:a", encoder["codec"], "-b:a", bitrate,
+    ]
+    if encoder["codec"] == "libopus":
+        command += ["-application", "voip"]
+    command += ["-f", encoder["format"], "pipe:1"]
+    try:
+        result = subprocess.run(command, input=segment.raw_data, capture_output=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return result.stdout
+
+
+def encode_segment(segment, settings=None, original_bytes=None):
+    """
+    Smallest upload of a decoded segment (see speech_segment) that fits the budget
+
+    Tries the configured encoders in order (first bitrate that fits), then WAV.
+
+    Returns:
+        EncodedAudio: data, filename (extension = format), format, original_bytes
+
+    Raises:
+        AudioTooLargeError: nothing fits max_upload_bytes
+    """
+    settings = settings or config.VOICE_AUDIO
+    budget = settings["max_upload_bytes"]
+    original_bytes = original_bytes or len(segment.raw_data)
+
+    ffmpeg = ffmpeg_binary(settings)
+    if ffmpeg:
+        for encoder in settings["encoders"]:
+            for bitrate in encoder["bitrates"]:
+                data = ffmpeg_encode(segment, encoder, bitrate, ffmpeg, settings["encode_timeout"])
+                if data is None:
+                    break  # encoder missing from this ffmpeg build: try the next one
+                if len(data) <= budget:
+                    return EncodedAudio(data, f"{AUDIO_BASENAME}.{encoder['format']}",
+                                        encoder["format"], original_bytes)
+
+    return _within_budget(EncodedAudio(wav_bytes(segment), f"{AUDIO_BASENAME}.wav", "wav", original_bytes),
+                          budget)
+
+
+def is_wav(audio_bytes):
+    return audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE"
+
+
+def encode_for_upload(audio_bytes, settings=None):
+    """
+    Smallest upload of a WAV recording that fits the size budget
+
+    16 kHz mono, then encode_segment. Audio that is not a readable WAV is
+    passed through.
+
+    Returns:
+        EncodedAudio: data, filename (extension = format), format, original_bytes
+
+    Raises:
+        AudioTooLargeError: nothing fits max_upload_bytes
+    """
+    settings = settings or config.VOICE_AUDIO
+    budget = settings["max_upload_bytes"]
+    original = EncodedAudio(audio_bytes, f"{AUDIO_BASENAME}.wav", "wav", len(audio_bytes))
+    if not settings.get("compress", True) or not is_wav(audio_bytes):
+        return _within_budget(original, budget)
+    try:
+        segment = speech_segment(audio_bytes, settings["sample_rate"])
+    except Exception:
+        return _within_budget(original, budget)
+
+    encoded = encode_segment(segment, settings, len(audio_bytes))
+    # A recording already at or below 16 kHz mono is not made bigger
+    if encoded.format == "wav" and len(audio_bytes) < len(encoded.data):
+        return original
+    return encoded
+
+
+def _within_budget(encoded, budget):
+    if len(encoded.data) > budget:
+        raise AudioTooLargeError(
+            f"Registrazione troppo lunga: {len(encoded.data) / 2**20:.1f} MB dopo la compressione "
+            f"(massimo {budget / 2**20:.0f} MB). Registra risposte più brevi."
+        )
+    return encoded
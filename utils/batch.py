@@ -0,0 +1,339 @@
+"""
+Batch analysis of exported workshop projects
+Headless (no Streamlit): reads the JSON exports of V1 and V2, runs the
+analysis with bounded concurrency and writes each parsed result back into
+the file's "analysis" field. Files that already have an analysis are
+skipped, so an interrupted run can simply be restarted.
+
+Transports are pluggable:
+- DirectTransport: Messages API, hedged model fallback + shared rate limiter
+- MessageBatchesTransport: Anthropic Message Batches API (cheaper, asynchronous)
+- FakeTransport: canned responses, for tests and dry runs
+"""
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import config
+from utils.analysis_cache import store_cached_analysis
+from utils.analysis_engine import ANALYSIS_SPECS
+from utils.analysis_prompts import SECTION_MARKERS
+from utils.cache import stable_hash
+from utils.hedging import hedged_message_text
+from utils.structured_output import tool_calls_from_content
+from utils.token_budget import prompt_metrics, usage_metrics, usage_to_dict
+
+# Default file names of the exports (V1 data_manager.download_button, V2 sidebar)
+EXPORT_PATTERNS = ("agentic_ai_project_*.json", "agentic_ai_workshop_v2_*.json")
+
+# Written next to the exports while a Message Batch is in flight
+BATCH_STATE_FILE = ".batch_state.json"
+
+
+class BatchItem:
+    """One exported project to analyze"""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        self.version = "v2" if data.get("version") == "2.0" else "v1"
+        self.answers = data.get("answers") or {}
+        # Message Batches custom_id: 1-64 chars of [a-zA-Z0-9_-]
+        self.custom_id = stable_hash("batch", os.path.basename(path))[:32]
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def spec(self):
+        return ANALYSIS_SPECS[self.version]
+
+    @property
+    def prompt_version(self):
+        return self.spec.prompt_version
+
+    def prepare_request(self):
+        """Same request parameters (and token budget) as the interactive analysis"""
+        return self.spec.prepare_request(self.answers)
+
+    def parse(self, analysis_text, model_name, tool_calls=None):
+        """Parse Claude's response exactly like the app does (structured tool input if valid)"""
+        structured = self.spec.structured_input(tool_calls)[0] if self.spec.structured else None
+        return self.spec.parse(self.answers, analysis_text, model_name, structured)
+
+
+def find_exports(directory, patterns=EXPORT_PATTERNS):
+    """Sorted list of export files in directory"""
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(os.path.join(directory, pattern)))
+    return sorted(paths)
+
+
+def load_items(paths, force=False):
+    """
+    Load export files, skipping those already analyzed (unless force)
+
+    Returns:
+        tuple: (items to analyze, list of (path, reason) skipped)
+    """
+    items = []
+    skipped = []
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            skipped.append((path, f"file non leggibile: {e}"))
+            continue
+
+        if not isinstance(data, dict) or not data.get("answers"):
+            skipped.append((path, "nessuna risposta"))
+            continue
+        if data.get("analysis") and not force:
+            skipped.append((path, "già analizzato"))
+            continue
+        items.append(BatchItem(path, data))
+    return items, skipped
+
+
+def write_result(item, analysis, model_name):
+    """Write the analysis into the export file (atomic replace)"""
+    item.data["analysis"] = analysis
+    item.data["analysis_metadata"] = {
+        "model": model_name,
+        "prompt_version": item.prompt_version,
+        "analyzed_at": datetime.now().isoformat(),
+    }
+    tmp_path = f"{item.path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(item.data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, item.path)
+
+
+# ============================================================================
+# TRANSPORTS
+# Interface: run(requests, on_result) where requests is a list of
+# (custom_id, message_kwargs) and on_result(custom_id, text, model, error, usage,
+# tool_calls) is called in the calling thread as soon as each response is available
+# ============================================================================
+
+class DirectTransport:
+    """Messages API with hedged model fallback, at most `concurrency` requests at once"""
+
+    def __init__(self, client, models=None, concurrency=4):
+        self.client = client
+        self.models = list(models or config.CLAUDE_MODELS)
+        self.concurrency = concurrency
+
+    def _call(self, message_kwargs):
+        text, model_name, _, usage, tool_calls = hedged_message_text(
+            self.client, self.models, message_kwargs, session_id="batch"
+        )
+        return text, model_name, usage, tool_calls
+
+    def run(self, requests, on_result):
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch-analysis") as executor:
+            futures = {executor.submit(self._call, kwargs): custom_id for custom_id, kwargs in requests}
+            try:
+                for future in as_completed(futures):
+                    custom_id = futures[future]
+                    try:
+                        text, model_name, usage, tool_calls = future.result()
+                    except Exception as e:
+                        on_result(custom_id, None, None, e)
+                        continue
+                    on_result(custom_id, text, model_name, None, usage, tool_calls)
+            except BaseException:
+                # Interrupted: don't start the requests still queued
+                for future in futures:
+                    future.cancel()
+                raise
+
+
+class MessageBatchesTransport:
+    """
+    Anthropic Message Batches API (one model, no fallback, ~50% cheaper)
+
+    The batch id is saved in state_path, so an interrupted run resumes
+    polling the same batch instead of submitting (and paying for) it again.
+    """
+
+    def __init__(self, client, model=None, state_path=None, poll_interval=30.0):
+        self.client = client
+        self.model = model or config.CLAUDE_MODELS[0]
+        self.state_path = state_path
+        self.poll_interval = poll_interval
+
+    @property
+    def _batches(self):
+        # Older SDKs expose the API under beta
+        batches = getattr(self.client.messages, "batches", None)
+        return batches if batches is not None else self.client.beta.messages.batches
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, state):
+        if self.state_path:
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2)
+
+    def _clear_state(self):
+        if self.state_path and os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def run(self, requests, on_result):
+        if not requests:
+            return
+        custom_ids = sorted(custom_id for custom_id, _ in requests)
+
+        # Same (or a subset of the) requests still pending: results are already paid for
+        state = self._load_state()
+        if state and set(custom_ids) <= set(state.get("custom_ids", [])):
+            batch_id = state["batch_id"]
+            print(f"Ripresa del batch {batch_id}")
+        else:
+            batch = self._batches.create(requests=[
+                {"custom_id": custom_id, "params": dict(model=self.model, **kwargs)}
+                for custom_id, kwargs in requests
+            ])
+            batch_id = batch.id
+            self._save_state({"batch_id": batch_id, "custom_ids": custom_ids, "model": self.model})
+            print(f"Batch {batch_id} inviato ({len(requests)} richieste)")
+
+        while True:
+            batch = self._batches.retrieve(batch_id)
+            if batch.processing_status == "ended":
+                break
+            counts = batch.request_counts
+            print(f"  in elaborazione: {counts.processing}, completate: {counts.succeeded}, errori: {counts.errored}")
+            time.sleep(self.poll_interval)
+
+        for entry in self._batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                text = "".join(block.text for block in result.message.content if getattr(block, "text", None))
+                on_result(entry.custom_id, text, result.message.model, None,
+                          usage_to_dict(getattr(result.message, "usage", None)),
+                          tool_calls_from_content(result.message.content))
+            else:
+                error = getattr(result, "error", None) or result.type
+                on_result(entry.custom_id, None, None, RuntimeError(f"{result.type}: {error}"))
+
+        self._clear_state()
+
+
+class FakeTransport:
+    """
+    Local transport returning canned responses in the expected format
+
+    Args:
+        respond: optional callable(custom_id, message_kwargs) -> text
+        fail: custom_ids that should return an error
+        delay: seconds to wait per request
+    """
+
+    def __init__(self, respond=None, fail=(), delay=0.0, model="fake-model"):
+        self.respond = respond or fake_response
+        self.fail = set(fail)
+        self.delay = delay
+        self.model = model
+        self.calls = []
+
+    def run(self, requests, on_result):
+        for custom_id, kwargs in requests:
+            self.calls.append(custom_id)
+            if self.delay:
+                time.sleep(self.delay)
+            if custom_id in self.fail:
+                on_result(custom_id, None, None, RuntimeError("fake error"))
+                continue
+            on_result(custom_id, self.respond(custom_id, kwargs), self.model, None)
+
+
+def fake_response(custom_id, message_kwargs):
+    """Canned analysis with every section/layer the parsers look for"""
+    system = message_kwargs.get("system", "")
+    if isinstance(system, list):
+        system = "".join(block["text"] for block in system)
+    if "LAYER 1: EXECUTIVE SUMMARY" in system:
+        return (
+            "## LAYER 1: EXECUTIVE SUMMARY\n\n**Score: 7/10**\n\n"
+            "**Punti di Forza:**\n- Processo ripetitivo\n- Dati disponibili\n\n"
+            "**Attenzioni:**\n- Integrazione con i sistemi esistenti\n\n"
+            "## LAYER 2: RAGIONAMENTO\n\n### 1. Analisi Complessità\nMedia.\n\n"
+            "## LAYER 3: ROADMAP DETTAGLIATA\n\n### FASE 1: PILOTA\nUn reparto.\n\n"
+            "## LAYER 4: ACTION PLAN\n\n### Questa Settimana\n- [ ] Definire il KPI\n"
+        )
+    sections = []
+    for marker in SECTION_MARKERS:
+        body = "Risposta simulata."
+        if marker == "FATTIBILITÀ TECNICA":
+            body = "Fattibilità 4/5."
+        elif marker == "SCORE COMPLESSIVO":
+            body = "7/10 - progetto solido."
+        sections.append(f"## {marker}\n{body}\n")
+    return "\n".join(sections)
+
+
+def analyze_exports(items, transport, on_progress=None, use_cache=True):
+    """
+    Analyze items through transport, writing each result as soon as it arrives
+
+    on_progress(item, error) is called after each item (error None on success).
+
+    Returns:
+        dict: {"analyzed": [...names], "failed": [(name, error), ...],
+               "prompt_tokens": estimated total, "tokens_saved": by compaction,
+               "usage": billed tokens incl. prompt-cache reads/writes}
+    """
+    by_id = {item.custom_id: item for item in items}
+    summary = {"analyzed": [], "failed": [], "prompt_tokens": 0, "tokens_saved": 0,
+               "usage": dict.fromkeys(usage_metrics.FIELDS, 0)}
+
+    requests = []
+    for item in items:
+        message_kwargs, report = item.prepare_request()
+        prompt_metrics.record(report)
+        summary["prompt_tokens"] += report["prompt_tokens"]
+        summary["tokens_saved"] += report["tokens_saved"]
+        requests.append((item.custom_id, message_kwargs))
+
+    def on_result(custom_id, text, model_name, error, usage=None, tool_calls=None):
+        item = by_id.get(custom_id)
+        if item is None:
+            return
+        if usage:
+            usage_metrics.record(usage)
+            for field in usage_metrics.FIELDS:
+                summary["usage"][field] += usage.get(field, 0)
+        if error is None:
+            try:
+                analysis = item.parse(text, model_name, tool_calls)
+                write_result(item, analysis, model_name)
+                if use_cache:
+                    # The app finds the same analysis when the project is reopened
+                    store_cached_analysis(item.version, item.answers, item.spec.cache_version, model_name, analysis)
+            except Exception as e:
+                error = e
+        if error is None:
+            summary["analyzed"].append(item.name)
+        else:
+            summary["failed"].append((item.name, str(error)))
+        if on_progress:
+            on_progress(item, error)
+
+    transport.run(requests, on_result)
+    return summary
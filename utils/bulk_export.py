@@ -0,0 +1,261 @@
+"""
+Bulk PDF export of workshop projects (headless, no Streamlit)
+One PDF per analyzed export file, rendered in a process pool: fpdf layout
+and matplotlib are pure-Python/CPU-bound, so threads would serialize on
+the GIL. Each worker keeps its parsed fonts and chart image cache for all
+the projects it renders. Optionally one booklet with every project and a
+table of contents.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import config
+
+BOOKLET_NAME = "booklet_workshop.pdf"
+BOOKLET_TITLE = "Agentic AI Workshop - Progetti"
+
+# Table of contents layout (booklet): heading block and row height, in mm
+TOC_TITLE_HEIGHT = 10
+TOC_TITLE_GAP = 4
+TOC_ROW_HEIGHT = 7
+TOC_TITLE_WIDTH = 160  # the page number takes the rest of the line
+
+
+class PdfItem:
+    """One analyzed project to export"""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.answers = data.get("answers") or {}
+        self.analysis = data.get("analysis") or {}
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def pdf_name(self):
+        return os.path.splitext(self.name)[0] + ".pdf"
+
+    @property
+    def title(self):
+        """First line of the process description, else the file name"""
+        process = str(self.answers.get("as_is_processo") or "").strip().split("\n")[0]
+        if process:
+            return process if len(process) <= 80 else process[:77] + "..."
+        return os.path.splitext(self.name)[0]
+
+
+def load_pdf_items(paths):
+    """
+    Load export files with an analysis to render
+
+    Returns:
+        tuple: (items, list of (path, reason) skipped)
+    """
+    items = []
+    skipped = []
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            skipped.append((path, f"file non leggibile: {e}"))
+            continue
+
+        if not isinstance(data, dict) or not data.get("analysis"):
+            skipped.append((path, "nessuna analisi (esegui prima batch_analyze.py)"))
+            continue
+        if data.get("version") == "2.0":
+            skipped.append((path, "progetto v2: il report PDF esiste solo per la v1"))
+            continue
+        items.append(PdfItem(path, data))
+    return items, skipped
+
+
+@contextmanager
+def _atomic_output(path):
+    """Binary file to stream a PDF into, renamed to path only once complete"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# ============================================================================
+# WORKER SIDE (runs in the pool processes)
+# ============================================================================
+
+def _init_worker(settings):
+    """Apply the parent's PDF settings and load the fonts once per worker"""
+    config.CHART_IMAGES.update(settings["charts"])
+    config.PDF_FONT.update(settings["fonts"])
+    if config.PDF_FONT.get("unicode", True):
+        from utils.pdf_fonts import get_font_templates
+        get_font_templates()
+
+
+def render_project_pdf(path, output_dir):
+    """
+    Render one export file to output_dir/<name>.pdf
+
+    Returns:
+        dict: name, output, seconds (render + write), bytes
+    """
+    from utils.export import generate_analysis_pdf
+
+    started = time.perf_counter()
+    with open(path, encoding="utf-8") as f:
+        item = PdfItem(path, json.load(f))
+    output = os.path.join(output_dir, item.pdf_name)
+    with _atomic_output(output) as f:
+        size = generate_analysis_pdf(item.answers, item.analysis, sink=f)
+    return {"name": item.name, "output": output, "seconds": time.perf_counter() - started, "bytes": size}
+
+
+def _fit_width(pdf, text, width):
+    """text cut with "..." to fit width in the current font (one line per entry)"""
+    if pdf.get_string_width(text) <= width:
+        return text
+    while text and pdf.get_string_width(text + "...") > width:
+        text = text[:-1]
+    return text.rstrip() + "..."
+
+
+def _toc_rows(pdf, top):
+    """(rows on the first page, rows on each next page) of a table of contents starting at y=top"""
+    usable = pdf.page_break_trigger - top
+    return (int((usable - TOC_TITLE_HEIGHT - TOC_TITLE_GAP) // TOC_ROW_HEIGHT),
+            int(usable // TOC_ROW_HEIGHT))
+
+
+def _toc_pages(pdf, entries):
+    """
+    Pages the table of contents will take (fpdf needs the exact count up front)
+
+    Call right after add_page(): pdf.y is the top of the content area, where
+    _render_toc starts every page.
+    """
+    first_page, per_page = _toc_rows(pdf, pdf.y)
+    if entries <= first_page:
+        return 1
+    return 1 + -(-(entries - first_page) // per_page)
+
+
+def _render_toc(pdf, outline):
+    # Page breaks are explicit, with the row counts of _toc_pages: fpdf's own
+    # breaks while rendering the placeholder restart at the top margin, over
+    # the header already drawn on the reserved pages
+    top = pdf.y
+    rows_left, per_page = _toc_rows(pdf, top)
+    pdf.set_x(pdf.l_margin)
+    pdf.set_font(pdf.font_family, 'B', 16)
+    pdf.set_text_color(27, 152, 224)
+    pdf.cell(0, TOC_TITLE_HEIGHT, "Indice", 0, 1)
+    pdf.ln(TOC_TITLE_GAP)
+    pdf.set_font(pdf.font_family, '', 11)
+    pdf.set_text_color(50, 50, 50)
+    for section in outline:
+        if section.level:
+            continue
+        if not rows_left:
+            pdf.add_page()
+            pdf.set_y(top)
+            rows_left = per_page
+        link = pdf.add_link(page=section.page_number)
+        # Truncated, not wrapped: _toc_pages counts one row per entry
+        name = _fit_width(pdf, section.name, TOC_TITLE_WIDTH - 2 * pdf.c_margin)
+        pdf.cell(TOC_TITLE_WIDTH, TOC_ROW_HEIGHT, name, 0, 0, link=link)
+        pdf.cell(0, TOC_ROW_HEIGHT, str(section.page_number), 0, 1, 'R', link=link)
+        rows_left -= 1
+
+
+def render_booklet(paths, output_path, title=BOOKLET_TITLE):
+    """
+    One PDF with a cover, a table of contents and the report of every project
+
+    Returns:
+        dict: name, output, seconds, bytes, projects
+    """
+    from utils.export import AnalysisPDF, add_analysis_report
+    from utils.pdf_stream import write_pdf
+
+    started = time.perf_counter()
+    items = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            items.append(PdfItem(path, json.load(f)))
+
+    pdf = AnalysisPDF()
+    pdf.add_page()
+    pdf.set_font(pdf.font_family, 'B', 22)
+    pdf.set_text_color(27, 152, 224)
+    pdf.ln(60)
+    pdf.multi_cell(0, 12, pdf._clean_text(title), align='C')
+    pdf.set_font(pdf.font_family, '', 12)
+    pdf.set_text_color(100, 100, 100)
+    pdf.cell(0, 10, f"{len(items)} progetti", 0, 1, 'C')
+
+    pdf.add_page()
+    pdf.insert_toc_placeholder(_render_toc, pages=_toc_pages(pdf, len(items)))
+    for item in items:
+        add_analysis_report(pdf, item.answers, item.analysis, title=item.title)
+
+    # Streamed to disk: the booklet is never held in memory as one buffer
+    with _atomic_output(output_path) as f:
+        size = write_pdf(pdf, f)
+    return {"name": os.path.basename(output_path), "output": output_path,
+            "seconds": time.perf_counter() - started, "bytes": size, "projects": len(items)}
+
+
+# ============================================================================
+# PARENT SIDE
+# ============================================================================
+
+def export_pdfs(items, output_dir, workers=None, booklet=False, on_done=None):
+    """
+    Render items in a process pool (one PDF each, plus the booklet if asked)
+
+    on_done(name, result, error) is called in the parent as each file completes.
+
+    Returns:
+        dict: rendered (list of result dicts), failed (list of (name, error))
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    # Passed explicitly: with the "spawn" start method workers re-import config
+    settings = {"charts": dict(config.CHART_IMAGES), "fonts": dict(config.PDF_FONT)}
+    rendered, failed = [], []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(settings,)) as pool:
+        futures = {}
+        if booklet and items:
+            # Submitted first: the longest task should not start last
+            future = pool.submit(render_booklet, [item.path for item in items],
+                                 os.path.join(output_dir, BOOKLET_NAME))
+            futures[future] = BOOKLET_NAME
+        for item in items:
+            futures[pool.submit(render_project_pdf, item.path, output_dir)] = item.name
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed.append((name, str(e)))
+                if on_done:
+                    on_done(name, None, e)
+                continue
+            rendered.append(result)
+            if on_done:
+                on_done(name, result, None)
+
+    return {"rendered": rendered, "failed": failed}
+
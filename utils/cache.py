@@ -0,0 +1,167 @@
+"""
+Cache utilities for Agentic AI Workshop
+In-process LRU tier (size-based eviction) + optional disk tier (JSON files)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def stable_hash(*parts):
+    """SHA-256 of the JSON representation of parts (key order independent)"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def estimate_size(value):
+    """Approximate payload size in bytes (used for LRU eviction)"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by total payload size (bytes)"""
+
+    def __init__(self, max_bytes, sizeof=estimate_size):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.current_bytes = 0
+        self.evictions = 0
+        self._items = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.current_bytes -= self._items.pop(key)[1]
+            # Items larger than the whole budget are never kept in memory
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._items:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item:
+                self.current_bytes -= item[1]
+                return item[0]
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+class DiskCache:
+    """JSON values stored one file per key, sharded by hash prefix"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            # Atomic rename: concurrent readers never see half-written files
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional disk tier, with hit/miss counters
+
+    Disk hits are promoted to memory. Disk values must be JSON serializable.
+    """
+
+    def __init__(self, max_memory_bytes, disk_dir=None, sizeof=estimate_size):
+        self.memory = LRUCache(max_memory_bytes, sizeof=sizeof)
+        self.disk = DiskCache(disk_dir) if disk_dir else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return value
+
+        if self.disk:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk:
+            self.disk.set(key, value)
+        with self._lock:
+            self.writes += 1
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": (hits / lookups) if lookups else 0.0,
+                "memory_items": len(self.memory),
+                "memory_bytes": self.memory.current_bytes,
+                "evictions": self.memory.evictions,
+            }
@@ -0,0 +1,108 @@
+"""
+Shared API clients for Agentic AI Workshop
+One pooled client per API key, reused by every session and every call,
+so HTTP connections and TLS sessions survive Streamlit reruns
+"""
+
+import threading
+import config
+
+_anthropic_clients = {}
+_openai_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _build_anthropic_client(api_key):
+    """Create an Anthropic client with explicit pool limits, keep-alive and timeouts"""
+    import httpx
+    from anthropic import Anthropic, DefaultHttpxClient
+
+    settings = config.ANTHROPIC_CLIENT
+    http_client = DefaultHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(
+            settings["read_timeout"],
+            connect=settings["connect_timeout"],
+        ),
+    )
+    return Anthropic(
+        api_key=api_key,
+        http_client=http_client,
+        max_retries=settings["max_retries"],
+    )
+
+
+def get_anthropic_client(api_key):
+    """
+    Process-wide Anthropic client registry keyed by API key
+
+    Args:
+        api_key: Anthropic API key
+
+    Returns:
+        Anthropic: shared client (thread-safe, reuse it instead of creating new ones)
+    """
+    with _clients_lock:
+        client = _anthropic_clients.get(api_key)
+        if client is None:
+            client = _build_anthropic_client(api_key)
+            _anthropic_clients[api_key] = client
+        return client
+
+
+def _build_openai_client(api_key):
+    """Create an OpenAI client (Whisper) with explicit pool limits, keep-alive and timeouts"""
+    import httpx
+    from openai import DefaultHttpxClient, OpenAI
+
+    settings = config.OPENAI_CLIENT
+    http_client = DefaultHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(
+            settings["read_timeout"],
+            connect=settings["connect_timeout"],
+        ),
+    )
+    return OpenAI(
+        api_key=api_key,
+        http_client=http_client,
+        max_retries=settings["max_retries"],
+    )
+
+
+def get_openai_client(api_key):
+    """
+    Process-wide OpenAI client registry keyed by API key
+
+    Args:
+        api_key: OpenAI API key
+
+    Returns:
+        OpenAI: shared client (thread-safe, reuse it instead of creating new ones)
+    """
+    with _clients_lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            client = _build_openai_client(api_key)
+            _openai_clients[api_key] = client
+        return client
+
+
+def close_clients():
+    """Close all pooled connections (e.g. at shutdown or in batch scripts)"""
+    with _clients_lock:
+        for client in (*_anthropic_clients.values(), *_openai_clients.values()):
+            try:
+                client.close()
+            except Exception:
+                pass
+        _anthropic_clients.clear()
+        _openai_clients.clear()
@@ -1,4 +1,5 @@
 import json
+import uuid
 import streamlit as st
 from datetime import datetime
 import pandas as pd
@@ -7,6 +8,12 @@ from streamlit_js_eval import streamlit_js_eval
 # Key for localStorage
 STORAGE_KEY = "agentic_workshop_data"
 
+def get_session_id():
+    """Stable id for the current browser session (used to tag background jobs)"""
+    if "_session_id" not in st.session_state:
+        st.session_state._session_id = uuid.uuid4().hex
+    return st.session_state._session_id
+
 def save_to_storage():
     """Save current session data to browser localStorage"""
     try:
@@ -63,6 +70,10 @@ def reset_project():
     st.session_state.current_question_index = 0
     st.session_state.current_section = "AS-IS"
     st.session_state.analysis_results = None
+    st.session_state.analysis_usage = None
+    st.session_state.analysis_metrics = None
+    st.session_state.pdf_export = None
+    st.session_state.analysis_job_id = None
     st.session_state._storage_loaded = False
 
     # Clear any widget keys that might have cached values
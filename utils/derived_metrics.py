@@ -0,0 +1,57 @@
+"""
+Derived analysis metrics
+Score, radar values, risk levels and impact-matrix position are computed
+once per analysis and kept in session state next to analysis_results,
+keyed on a content hash of the analysis and of the answers they read.
+Reruns (expanders, buttons, tab switches) reuse them instead of redoing
+the keyword scans; the figures built from them are cached per content in
+utils.visualizations (build_* functions).
+"""
+
+from utils.analysis_prompts import extract_score
+from utils.cache import stable_hash
+from utils.scoring import score_analysis
+
+# Answers read by scoring.process_position (the only metric that uses them)
+POSITION_ANSWER_KEYS = ("as_is_step", "to_be_dati_sistemi", "to_be_tool", "to_be_azioni_limiti")
+
+SESSION_KEY = "analysis_metrics"
+
+
+def metrics_key(analysis_results, answers):
+    """Content hash of everything the derived metrics depend on"""
+    answers = answers or {}
+    return stable_hash("metrics", analysis_results, {key: answers.get(key) for key in POSITION_ANSWER_KEYS})
+
+
+def compute_derived_metrics(analysis_results, answers):
+    """
+    All metrics shown in the analysis dashboard
+
+    Returns:
+        dict: score (int or None), radar (tuple), risks (tuple), position ((x, y), None if no answers)
+    """
+    scores = score_analysis(analysis_results, answers)
+    return {
+        "score": extract_score(analysis_results),
+        "radar": tuple(scores.radar),
+        "risks": tuple(scores.risks),
+        "position": scores.position,
+    }
+
+
+def get_derived_metrics(state, analysis_results, answers):
+    """
+    Metrics stored in state (e.g. st.session_state) if analysis and answers
+    are unchanged, otherwise recomputed and stored
+
+    Returns:
+        dict: see compute_derived_metrics
+    """
+    key = metrics_key(analysis_results, answers)
+    cached = state.get(SESSION_KEY)
+    if cached and cached.get("key") == key:
+        return cached["metrics"]
+    metrics = compute_derived_metrics(analysis_results, answers)
+    state[SESSION_KEY] = {"key": key, "metrics": metrics}
+    return metrics
@@ -0,0 +1,341 @@
+"""
+Hedged requests for Claude model fallback
+Launches the primary model and, after a delay or on the first error, the
+next fallback concurrently (rate limited via utils.rate_limit). The first attempt that starts streaming wins,
+the others are cancelled. Per-model latency/error metrics adapt the order.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import config
+from utils.rate_limit import RateLimitCancelled, call_with_backoff, get_rate_limiter
+from utils.structured_output import tool_calls_from_content
+from utils.token_budget import estimate_tokens, usage_to_dict
+
+# Worker pool shared by all sessions (attempts are I/O bound)
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="claude-hedge")
+
+
+class HedgeCancelled(Exception):
+    """Raised inside an attempt that lost the race"""
+
+
+class HedgedRequestError(Exception):
+    """All models failed"""
+
+    def __init__(self, errors):
+        self.errors = errors  # list of (model_name, exception)
+        last_error = errors[-1][1] if errors else None
+        super().__init__(str(last_error) if last_error else "Nessun modello disponibile")
+        self.last_error = last_error
+
+
+class ModelMetrics:
+    """Thread-safe per-model latency (EWMA) and error counters"""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, model):
+        return self._stats.setdefault(model, {
+            "attempts": 0,
+            "successes": 0,
+            "errors": 0,
+            "cancelled": 0,
+            "ttft_ewma": None,      # time to first token (s)
+            "duration_ewma": None,  # full response time (s)
+        })
+
+    def _ewma(self, previous, value):
+        return value if previous is None else self.alpha * value + (1 - self.alpha) * previous
+
+    def record_attempt(self, model):
+        with self._lock:
+            self._entry(model)["attempts"] += 1
+
+    def record_first_token(self, model, ttft):
+        with self._lock:
+            entry = self._entry(model)
+            entry["ttft_ewma"] = self._ewma(entry["ttft_ewma"], ttft)
+
+    def record_success(self, model, duration):
+        with self._lock:
+            entry = self._entry(model)
+            entry["successes"] += 1
+            entry["duration_ewma"] = self._ewma(entry["duration_ewma"], duration)
+
+    def record_error(self, model):
+        with self._lock:
+            self._entry(model)["errors"] += 1
+
+    def record_cancelled(self, model):
+        with self._lock:
+            self._entry(model)["cancelled"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {model: dict(entry) for model, entry in self._stats.items()}
+
+    def order(self, models, min_attempts=3, max_error_rate=0.5):
+        """
+        Adaptive fallback order: healthy models with measured latency first
+        (fastest first), then unmeasured ones in the given order, then models
+        that fail more than max_error_rate of the time
+        """
+        stats = self.snapshot()
+
+        def sort_key(indexed):
+            index, model = indexed
+            entry = stats.get(model)
+            if not entry:
+                return (1, 0.0, index)
+            finished = entry["errors"] + entry["successes"]
+            if finished >= min_attempts and entry["errors"] / finished > max_error_rate:
+                return (2, 0.0, index)
+            if entry["ttft_ewma"] is None:
+                return (1, 0.0, index)
+            return (0, entry["ttft_ewma"], index)
+
+        return [model for _, model in sorted(enumerate(models), key=sort_key)]
+
+
+# Process-wide metrics (all sessions share the same API key)
+model_metrics = ModelMetrics()
+
+
+class HedgeAttempt:
+    """State shared between the executor and one running attempt"""
+
+    def __init__(self, race, model):
+        self.race = race
+        self.model = model
+        self.cancelled = threading.Event()
+        self.sent_at = None  # None while waiting for a rate-limit slot or backing off
+
+    def mark_sent(self):
+        self.sent_at = time.monotonic()
+
+    def mark_waiting(self):
+        self.sent_at = None
+
+    def claim(self):
+        """Try to become the winning attempt. Returns False if another attempt already won"""
+        with self.race["lock"]:
+            if self.race["owner"] is None:
+                self.race["owner"] = self
+            return self.race["owner"] is self
+
+    def release(self):
+        """Give up ownership (attempt failed after claiming)"""
+        with self.race["lock"]:
+            if self.race["owner"] is self:
+                self.race["owner"] = None
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise HedgeCancelled()
+
+
+def run_hedged(models, call, hedge_delay, max_parallel=2, metrics=model_metrics,
+               on_tick=None, tick_interval=0.1):
+    """
+    Run call(model, attempt) with hedging across models
+
+    The next model is launched when hedge_delay elapses after the request was
+    actually sent without any attempt claiming the race, or immediately when
+    an attempt fails. Attempts waiting for a rate-limit slot don't trigger
+    hedging (that would only add load). At most max_parallel attempts run at
+    once. on_tick() is called periodically in the calling thread (e.g. to
+    render streamed sections).
+
+    Returns:
+        tuple: (result, model_name, errors) - errors lists failed (model, exception)
+
+    Raises:
+        HedgedRequestError: if every model failed
+    """
+    race = {"lock": threading.Lock(), "owner": None}
+    remaining = list(models)
+    pending = {}
+    errors = []
+
+    def launch():
+        model = remaining.pop(0)
+        attempt = HedgeAttempt(race, model)
+        metrics.record_attempt(model)
+        future = _executor.submit(_run_attempt, call, model, attempt, metrics)
+        pending[future] = attempt
+
+    def hedge_deadline():
+        if not remaining or len(pending) >= max_parallel or race["owner"] is not None:
+            return None
+        sent = [attempt.sent_at for attempt in pending.values()]
+        if not sent or None in sent:
+            return None
+        return max(sent) + hedge_delay
+
+    try:
+        launch()
+
+        while pending:
+            timeout = tick_interval
+            deadline = hedge_deadline()
+            if deadline is not None:
+                timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if on_tick:
+                on_tick()
+
+            for future in done:
+                attempt = pending.pop(future)
+                try:
+                    result = future.result()
+                except HedgeCancelled:
+                    continue
+                except Exception as e:
+                    errors.append((attempt.model, e))
+                    # First error -> start the next fallback right away
+                    if remaining and len(pending) < max_parallel:
+                        launch()
+                    continue
+
+                return result, attempt.model, errors
+
+            deadline = hedge_deadline()
+            if deadline is not None and time.monotonic() >= deadline:
+                launch()
+
+            if not pending and remaining:
+                launch()
+
+        raise HedgedRequestError(errors)
+
+    finally:
+        # Cancel the losers: queued attempts never start, running ones stop at next check
+        for future, attempt in pending.items():
+            attempt.cancelled.set()
+            future.cancel()
+
+
+def _run_attempt(call, model, attempt, metrics):
+    start = time.monotonic()
+    try:
+        result = call(model, attempt)
+    except HedgeCancelled:
+        metrics.record_cancelled(model)
+        raise
+    except Exception:
+        attempt.release()
+        metrics.record_error(model)
+        raise
+    metrics.record_success(model, time.monotonic() - start)
+    return result
+
+
+def estimate_request_tokens(message_kwargs):
+    """Token estimate for rate limiting: system + prompt (local estimate) + max output"""
+    system = message_kwargs.get("system", "")
+    if isinstance(system, list):
+        system = "".join(block.get("text", "") for block in system)
+    prompt_tokens = estimate_tokens(system)
+    prompt_tokens += sum(estimate_tokens(m.get("content", "")) for m in message_kwargs.get("messages", []))
+    return prompt_tokens + message_kwargs.get("max_tokens", 0)
+
+
+def _final_details(stream):
+    """
+    Usage (input/output and prompt-cache tokens, None if unavailable) and
+    tool calls [(name, input), ...] of a finished stream
+    """
+    try:
+        message = stream.get_final_message()
+    except Exception:
+        return None, []
+    usage = usage_to_dict(getattr(message, "usage", None))
+    return usage, tool_calls_from_content(getattr(message, "content", None))
+
+
+def hedged_message_text(client, models, message_kwargs, on_section=None, parser_factory=None,
+                        session_id="default"):
+    """
+    Hedged streaming Messages API call across models
+
+    Every attempt streams; the first one to produce a token claims the race
+    and the others are cancelled. Sections parsed by parser_factory()
+    from the winning stream are delivered to on_section(key, content) from
+    the calling thread. Each attempt waits for its turn in the workshop-wide
+    rate limiter and retries 429/529 on the same model with backoff.
+
+    Returns:
+        tuple: (response_text, model_name, errors, usage, tool_calls) - usage is
+            a dict of billed tokens (see utils.token_budget.usage_to_dict) or
+            None, tool_calls a list of (tool name, input) from the final message
+    """
+    settings = config.HEDGING
+    if settings.get("adaptive_order", True):
+        models = model_metrics.order(models)
+
+    sections = queue.Queue()
+
+    limiter = get_rate_limiter("anthropic")
+    request_tokens = estimate_request_tokens(message_kwargs)
+
+    def stream_once(model, attempt):
+        chunks = []
+        parser = parser_factory() if (on_section and parser_factory) else None
+        with limiter.slot(session_id, request_tokens, cancelled=attempt.cancelled):
+            attempt.mark_sent()
+            start = time.monotonic()
+            with client.messages.stream(model=model, **message_kwargs) as stream:
+                for text in stream.text_stream:
+                    if not chunks:
+                        model_metrics.record_first_token(model, time.monotonic() - start)
+                        if not attempt.claim():
+                            raise HedgeCancelled()
+                    attempt.check()
+                    chunks.append(text)
+                    if parser:
+                        for section in parser.feed(text):
+                            sections.put(section)
+                usage, tool_calls = _final_details(stream)
+        if parser:
+            for section in parser.close():
+                sections.put(section)
+        return "".join(chunks), usage, tool_calls
+
+    def call(model, attempt):
+        try:
+            return call_with_backoff(
+                lambda: stream_once(model, attempt),
+                cancelled=attempt.cancelled,
+                on_wait=lambda delay: attempt.mark_waiting()
+            )
+        except RateLimitCancelled:
+            raise HedgeCancelled()
+
+    def deliver_sections():
+        while True:
+            try:
+                key, content = sections.get_nowait()
+            except queue.Empty:
+                return
+            on_section(key, content)
+
+    max_parallel = settings.get("max_parallel", 2) if settings.get("enabled", True) else 1
+    (text, usage, tool_calls), model, errors = run_hedged(
+        models,
+        call,
+        hedge_delay=settings.get("hedge_delay", 6.0),
+        max_parallel=max_parallel,
+        on_tick=deliver_sections if on_section else None,
+    )
+    if on_section:
+        deliver_sections()
+    return text, model, errors, usage, tool_calls
@@ -0,0 +1,153 @@
+"""
+Background jobs for AI analysis
+Analyses run in a bounded thread pool outside the Streamlit script thread,
+so reruns, clicks and tab switches never abort a running generation.
+Jobs are deduplicated by content key and results kept in a shared store.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from utils.analysis_cache import normalize_answers
+from utils.analysis_engine import EVENT_COMPLETED, EVENT_PROMPT_BUDGET, EVENT_SECTION
+from utils.cache import stable_hash
+
+# Job status values
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class AnalysisJob:
+    """One analysis request and its (partial) results"""
+
+    def __init__(self, session_id, dedup_key):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.dedup_key = dedup_key
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.sections = {}  # partial sections streamed so far (key -> content)
+        self.prompt_report = None  # token budget of the prompt sent
+        self.usage = None  # billed tokens incl. prompt-cache reads/writes
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def add_section(self, key, content):
+        """on_section callback: store a streamed section for progressive display"""
+        self.sections[key] = content
+
+    def on_event(self, event, data):
+        """analysis_engine on_event hook: keep streamed sections, prompt budget and usage"""
+        if event == EVENT_SECTION:
+            self.add_section(data["key"], data["content"])
+        elif event == EVENT_PROMPT_BUDGET:
+            self.prompt_report = data["report"]
+        elif event == EVENT_COMPLETED:
+            self.usage = data["result"].usage
+
+    def elapsed(self):
+        end = self.finished_at or time.time()
+        return end - (self.started_at or self.created_at)
+
+
+class JobManager:
+    """Bounded worker pool + shared job store"""
+
+    def __init__(self, max_workers=4, job_ttl=3600):
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, dedup_key, fn):
+        """
+        Submit fn(job) -> result unless an identical job is already queued/running
+
+        Returns:
+            str: job id (the existing one if deduplicated)
+        """
+        with self._lock:
+            self._cleanup()
+            existing = self._find_active(dedup_key)
+            if existing:
+                return existing.id
+
+            job = AnalysisJob(session_id, dedup_key)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, fn)
+        return job.id
+
+    def get(self, job_id):
+        if not job_id:
+            return None
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find_active(self, dedup_key):
+        """Running/queued job for the same content (e.g. after a page reload)"""
+        with self._lock:
+            return self._find_active(dedup_key)
+
+    def queue_position(self, job_id):
+        """1-based position among queued jobs, 0 if running/finished"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job.status != QUEUED:
+                return 0
+            queued = sorted((j for j in self._jobs.values() if j.status == QUEUED), key=lambda j: j.created_at)
+            return queued.index(job) + 1
+
+    def _find_active(self, dedup_key):
+        for job in self._jobs.values():
+            if job.dedup_key == dedup_key and job.active:
+                return job
+        return None
+
+    def _cleanup(self):
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if not job.active and job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job, fn):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+        except Exception as e:
+            job.error = str(e)
+        job.finished_at = time.time()
+        # Status last: pollers only see DONE once the result is in place
+        job.status = DONE if job.result else FAILED
+
+
+def analysis_job_key(namespace, answers):
+    """Dedup key: same answers -> same job, even across reruns or page reloads"""
+    return stable_hash("job", namespace, normalize_answers(answers))
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Process-wide job manager (shared by all sessions)"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            settings = config.ANALYSIS_JOBS
+            _manager = JobManager(max_workers=settings["max_workers"], job_ttl=settings["job_ttl"])
+        return _manager
@@ -0,0 +1,174 @@
+"""
+Vector charts for the PDF export
+Radar, risk bars and impact matrix drawn with fpdf primitives (lines,
+polygons, text) at the current position: no matplotlib, no rasterization,
+a few KB of drawing operators instead of a 150 dpi PNG per chart.
+Same values and layout as the matplotlib images in utils.export.
+"""
+
+import math
+
+BLUE = (27, 152, 224)
+GRID = (200, 200, 200)
+TEXT = (50, 50, 50)
+
+RADAR_LABELS = ("Fattibilità\nTecnica", "Impatto\nBusiness", "Gestione\nRischi",
+                "ROI\nPrevisto", "Facilità\nImplementazione")
+RISK_LABELS = ("Tecnico", "Privacy/GDPR", "Organizzativo", "Legale", "Resistenza")
+
+# Quadrants: (x0, y0) in chart units (y up), fill colour, label
+MATRIX_QUADRANTS = (
+    (0.0, 0.0, (253, 232, 232), "Processi\nSemplici"),
+    (0.5, 0.0, (254, 246, 218), "Augmentation\nSupporto"),
+    (0.0, 0.5, (229, 240, 253), "Alto Rischio\nGiudizio"),
+    (0.5, 0.5, (221, 251, 235), "Automazione\nCompleta"),
+)
+
+
+def risk_color(level):
+    """Bar colour for a risk level (same thresholds as the matplotlib chart)"""
+    if level >= 4:
+        return (239, 68, 68)
+    if level >= 3:
+        return (245, 158, 11)
+    return (16, 185, 129)
+
+
+def _reserve(pdf, height):
+    """Start a new page if height (mm) does not fit below the current position"""
+    if pdf.get_y() + height > pdf.page_break_trigger:
+        pdf.add_page()
+
+
+def _label(pdf, x, y, text, align="C", size=8, style=""):
+    """Multi-line label centered (or left/right aligned) on x, first baseline at y"""
+    pdf.set_font(pdf.font_family, style, size)
+    line_height = size * 0.42
+    for index, line in enumerate(pdf._clean_text(text).split("\n")):
+        width = pdf.get_string_width(line)
+        if align == "C":
+            left = x - width / 2
+        elif align == "R":
+            left = x - width
+        else:
+            left = x
+        pdf.text(left, y + index * line_height, line)
+
+
+def _star(cx, cy, r_out, r_in, corners=5):
+    """Points of a star marker pointing up"""
+    points = []
+    for index in range(corners * 2):
+        radius = r_out if index % 2 == 0 else r_in
+        angle = -math.pi / 2 + index * math.pi / corners
+        points.append((cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+    return points
+
+
+def draw_radar_chart(pdf, values, width=120):
+    """Radar chart of values (1-5) in RADAR_LABELS order, centered on the page"""
+    height = width * 0.8
+    _reserve(pdf, height)
+    cx = pdf.w / 2
+    cy = pdf.get_y() + height / 2
+    radius = height * 0.36
+    count = len(values)
+    # First axis at the top, then clockwise
+    angles = [-math.pi / 2 + 2 * math.pi * i / count for i in range(count)]
+
+    def point(angle, value):
+        return (cx + radius * value / 5 * math.cos(angle), cy + radius * value / 5 * math.sin(angle))
+
+    with pdf.local_context(draw_color=GRID, line_width=0.2, text_color=(120, 120, 120)):
+        for ring in range(1, 6):
+            pdf.polygon([point(angle, ring) for angle in angles])
+            _label(pdf, cx + 1, cy - radius * ring / 5 - 0.5, str(ring), align="L", size=6)
+        for angle in angles:
+            pdf.line(cx, cy, *point(angle, 5))
+
+    data = [point(angle, value) for angle, value in zip(angles, values)]
+    with pdf.local_context(fill_color=BLUE, fill_opacity=0.3):
+        pdf.polygon(data, style="F")
+    with pdf.local_context(draw_color=BLUE, line_width=0.6):
+        pdf.polygon(data)
+
+    with pdf.local_context(text_color=TEXT):
+        for angle, label in zip(angles, RADAR_LABELS):
+            lx, ly = point(angle, 6.2)
+            align = "C" if abs(math.cos(angle)) < 0.3 else ("L" if math.cos(angle) > 0 else "R")
+            _label(pdf, lx, ly, label, align=align, size=8)
+
+    pdf.set_y(cy + height / 2)
+
+
+def draw_risk_chart(pdf, risks, width=150):
+    """Horizontal bars of risk levels (1-5) in RISK_LABELS order"""
+    row = 8
+    height = row * len(risks) + 16
+    _reserve(pdf, height)
+    label_width = 30
+    left = (pdf.w - width) / 2 + label_width
+    bar_area = width - label_width - 10
+    top = pdf.get_y() + 2
+    scale = bar_area / 5.5
+
+    # Grid and axis (0-5)
+    with pdf.local_context(draw_color=GRID, line_width=0.2, text_color=(120, 120, 120)):
+        for tick in range(6):
+            x = left + tick * scale
+            pdf.line(x, top, x, top + row * len(risks))
+            _label(pdf, x, top + row * len(risks) + 4, str(tick), size=7)
+    with pdf.local_context(text_color=TEXT):
+        _label(pdf, left + bar_area / 2, top + row * len(risks) + 9, "Livello Rischio (1-5)", size=8)
+
+    for index, (label, level) in enumerate(zip(RISK_LABELS, risks)):
+        y = top + index * row
+        with pdf.local_context(fill_color=risk_color(level)):
+            pdf.rect(left, y + 1.5, level * scale, row - 3, style="F")
+        with pdf.local_context(text_color=TEXT):
+            _label(pdf, left - 2, y + row / 2 + 1.2, label, align="R", size=8)
+            _label(pdf, left + level * scale + 1.5, y + row / 2 + 1.2, f"{level}/5", align="L", size=8)
+
+    pdf.set_y(top + height)
+
+
+def draw_matrix_chart(pdf, position, width=140):
+    """2x2 impact matrix (complexity x AI autonomy) with the process marker at position (x, y)"""
+    size = width * 0.72
+    height = size + 16
+    _reserve(pdf, height)
+    left = (pdf.w - size) / 2 + 4
+    top = pdf.get_y() + 2
+
+    def to_page(x, y):
+        return left + x * size, top + (1 - y) * size
+
+    for x0, y0, color, label in MATRIX_QUADRANTS:
+        px, py = to_page(x0, y0 + 0.5)
+        with pdf.local_context(fill_color=color):
+            pdf.rect(px, py, size / 2, size / 2, style="F")
+        with pdf.local_context(text_color=TEXT):
+            _label(pdf, px + size / 4, py + size / 4 - 1, label, size=8)
+
+    with pdf.local_context(draw_color=(150, 150, 150), line_width=0.3):
+        pdf.set_dash_pattern(dash=1.5, gap=1.5)
+        pdf.line(*to_page(0, 0.5), *to_page(1, 0.5))
+        pdf.line(*to_page(0.5, 0), *to_page(0.5, 1))
+        pdf.set_dash_pattern()
+        pdf.rect(left, top, size, size)
+
+    with pdf.local_context(text_color=TEXT):
+        _label(pdf, left + size / 2, top + size + 6, "Complessità Processo →", size=9)
+        # Vertical axis label, rotated
+        with pdf.rotation(90, left - 4, top + size / 2):
+            _label(pdf, left - 4, top + size / 2, "Autonomia AI →", size=9)
+
+    x, y = position
+    if x is not None and y is not None:
+        sx, sy = to_page(x, y)
+        with pdf.local_context(fill_color=BLUE, draw_color=(255, 255, 255), line_width=0.4):
+            pdf.polygon(_star(sx, sy, 4.5, 1.9), style="DF")
+        with pdf.local_context(text_color=BLUE):
+            _label(pdf, sx + 5, sy - 3, "Il tuo\nprocesso", align="L", size=8, style="B")
+
+    pdf.set_y(top + height)
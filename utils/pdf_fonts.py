@@ -0,0 +1,149 @@
+"""
+Unicode TrueType fonts for the PDF export
+The TTF files are reduced once per process to the Unicode ranges a report
+needs and parsed into template fonts (metrics, cmap, glyph widths); each
+PDF gets a cheap copy with its own glyph subset, so only the glyphs actually
+used are embedded and neither add_font (~140 ms for three DejaVu styles)
+nor decoding the full fonts is paid per export.
+The DejaVu files ship with the app (assets/fonts, see config.PDF_FONT);
+matplotlib's copy is only a fallback. Without the font files the PDF falls
+back to the latin-1 core fonts.
+"""
+
+import copy
+import io
+import os
+import threading
+
+import config
+
+# Scripts and symbols kept in the base fonts: Latin (accents), punctuation,
+# currency, letterlike, arrows, math, box drawing, shapes, symbols, dingbats.
+# Every export subsets these few hundred glyphs instead of the ~6000 of DejaVu
+UNICODE_RANGES = (
+    (0x0020, 0x007E),
+    (0x00A0, 0x017F),
+    (0x2000, 0x206F),
+    (0x20A0, 0x20BF),
+    (0x2100, 0x214F),
+    (0x2190, 0x21FF),
+    (0x2200, 0x22FF),
+    (0x2500, 0x257F),
+    (0x25A0, 0x27BF),
+)
+
+_templates = None  # {"fonts": {fontkey: TTFFont}, "data": {fontkey: bytes}, "charset": frozenset}
+_templates_lock = threading.Lock()
+
+
+def font_dirs():
+    """Directories to look for the TTF files in: config/env (assets/fonts), then matplotlib's DejaVu"""
+    dirs = [config.PDF_FONT.get("dir")]
+    try:
+        import matplotlib
+        dirs.append(os.path.join(matplotlib.get_data_path(), "fonts", "ttf"))
+    except ImportError:
+        pass
+    return [directory for directory in dirs if directory]
+
+
+def font_files():
+    """{style: path} of the configured font files (first directory with all of them), None if missing"""
+    for directory in font_dirs():
+        paths = {style: os.path.join(directory, name) for style, name in config.PDF_FONT["files"].items()}
+        if all(os.path.isfile(path) for path in paths.values()):
+            return paths
+    return None
+
+
+def _base_subset(path):
+    """Font bytes reduced to UNICODE_RANGES (layout tables dropped as fpdf does)"""
+    from fontTools import subset, ttLib
+
+    options = subset.Options(notdef_outline=True, recommended_glyphs=True, layout_features=[])
+    options.drop_tables += ["FFTM", "GDEF", "GPOS", "GSUB", "MATH", "hdmx", "meta"]
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=[code for start, end in UNICODE_RANGES for code in range(start, end + 1)])
+    font = ttLib.TTFont(path, recalcTimestamp=False)
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    font.save(buffer)
+    return buffer.getvalue()
+
+
+def _load_templates():
+    """Subset and parse the font files once (None if unavailable, unreadable or fpdf2 too old)"""
+    from fpdf import FPDF
+
+    paths = font_files()
+    if paths is None:
+        return None
+    family = config.PDF_FONT["family"]
+    try:
+        # fpdf2 private API (requirements.txt pins the version it matches)
+        from fpdf.fonts import TTFFont
+
+        loader = FPDF()
+        fonts, data = {}, {}
+        for style, path in paths.items():
+            key = f"{family.lower()}{style}"
+            data[key] = _base_subset(path)
+            fonts[key] = TTFFont(loader, io.BytesIO(data[key]), key, style)
+    except Exception:
+        return None
+    charset = frozenset(map(chr, fonts[family.lower()].cmap))
+    return {"fonts": fonts, "data": data, "charset": charset}
+
+
+def get_font_templates():
+    """Process-wide parsed fonts, None if the Unicode mode is unavailable"""
+    global _templates
+    with _templates_lock:
+        if _templates is None:
+            _templates = _load_templates() or {}
+        return _templates or None
+
+
+def font_charset():
+    """Characters with a glyph in the regular style (empty without fonts)"""
+    templates = get_font_templates()
+    return templates["charset"] if templates else frozenset()
+
+
+def add_unicode_fonts(pdf):
+    """
+    Register the Unicode font family on pdf from the parsed templates
+
+    Each font is a shallow copy of the template with a fresh fontTools
+    object (lazy, from the cached bytes) and its own subset map: fpdf
+    subsets the font object in place when writing the PDF.
+
+    Returns:
+        str: font family to pass to set_font, None if unavailable
+    """
+    templates = get_font_templates()
+    if templates is None:
+        return None
+
+    from fontTools import ttLib
+
+    family = config.PDF_FONT["family"]
+    try:
+        from fpdf.fonts import SubsetMap
+
+        for key, template in templates["fonts"].items():
+            font = copy.copy(template)
+            font.i = len(pdf.fonts) + 1
+            font.ttfont = ttLib.TTFont(io.BytesIO(templates["data"][key]), recalcTimestamp=False, lazy=True)
+            font.biggest_size_pt = 0
+            font.missing_glyphs = []
+            font._hbfont = None
+            font.subset = SubsetMap(font)
+            pdf.fonts[key] = font
+    except Exception:
+        # fpdf internals differ (other fpdf2 version): parse the files for this PDF (slower, same output)
+        for key in templates["fonts"]:
+            pdf.fonts.pop(key, None)
+        for style, path in font_files().items():
+            pdf.add_font(family, style, path)
+    return family
@@ -0,0 +1,99 @@
+"""
+Streaming PDF output
+fpdf serializes the whole document into one bytearray (pdf.output()) that
+callers then copy again with bytes(): a long booklet is held in memory two
+or three times over. write_pdf plugs a write-through buffer into fpdf's
+output producer, so each PDF object goes to the sink (file, spooled temp
+file, HTTP response...) as soon as it is serialized and only its offset is
+kept. The page content streams still live in the FPDF object until output:
+fpdf has no incremental page writer.
+"""
+
+import functools
+import hashlib
+import io
+
+from fpdf import FPDF
+from fpdf.output import OutputProducer
+
+
+class _SinkBuffer:
+    """
+    Stand-in for OutputProducer.buffer: appends go straight to the sink
+
+    fpdf only appends (+=) and reads the length (object offsets, startxref).
+    The MD5 of everything written is kept for the default /ID, which fpdf
+    otherwise computes over the full in-memory buffer.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.size = 0
+        self.md5 = hashlib.new("md5", usedforsecurity=False)  # nosec B324 - file identifier, as fpdf
+
+    def __iadd__(self, data):
+        self.sink.write(data)
+        self.md5.update(data)
+        self.size += len(data)
+        return self
+
+    def __len__(self):
+        return self.size
+
+
+class _StreamingOutputProducer(OutputProducer):
+    def __init__(self, fpdf, buffer):
+        super().__init__(fpdf)
+        self.buffer = buffer
+
+
+def write_pdf(pdf, sink):
+    """
+    Serialize pdf into sink (any object with write(bytes)), object by object
+
+    Same bytes as pdf.output(); signed PDFs are written in one go (the
+    signature is computed over the full buffer).
+
+    Returns:
+        int: bytes written
+    """
+    if pdf.buffer:
+        raise ValueError("PDF già generato: write_pdf va chiamato una sola volta per documento")
+    if pdf._sign_key:
+        data = pdf.output()
+        sink.write(data)
+        return len(data)
+
+    buffer = _SinkBuffer(sink)
+
+    def stream_file_id():
+        # Same value as FPDF._default_file_id over the in-memory buffer
+        id_hash = buffer.md5.copy()
+        if pdf.creation_date:
+            id_hash.update(pdf.creation_date.strftime("%Y%m%d%H%M%S").encode("utf8"))
+        hash_hex = id_hash.hexdigest().upper()
+        return f"<{hash_hex}><{hash_hex}>"
+
+    default_id = type(pdf).file_id is FPDF.file_id
+    if default_id:
+        pdf.file_id = stream_file_id
+    try:
+        result = pdf.output(output_producer_class=functools.partial(_StreamingOutputProducer, buffer=buffer))
+    finally:
+        if default_id:
+            del pdf.file_id
+
+    if result is not buffer:
+        # fpdf internals changed and the producer filled its own bytearray
+        sink.write(result)
+        return len(result)
+    # pdf.buffer is now the stand-in: drop its reference to the sink
+    buffer.sink = None
+    return buffer.size
+
+
+def pdf_bytes(pdf):
+    """The PDF as bytes, streamed through one BytesIO instead of bytearray + copy"""
+    sink = io.BytesIO()
+    write_pdf(pdf, sink)
+    return sink.getvalue()
@@ -0,0 +1,152 @@
+"""
+Text sanitizer for the PDF core fonts (latin-1)
+The typographic characters the model writes (quotes, dashes, bullets,
+arrows, accented vowels...) are found by one precompiled character class
+and replaced from a table; every other code point outside latin-1 is then
+dropped by the codec in C. With an embedded Unicode font (utils.pdf_fonts)
+only the characters without a glyph are removed.
+Pure module (no Streamlit, no fpdf).
+"""
+
+import re
+
+# Character replacements for latin-1 compatibility
+PDF_REPLACEMENTS = {
+    # Quotes
+    '\u2019': "'",   # Right single quote
+    '\u2018': "'",   # Left single quote
+    '\u201c': '"',   # Left double quote
+    '\u201d': '"',   # Right double quote
+    '\u00ab': '"',   # Left guillemet
+    '\u00bb': '"',   # Right guillemet
+    '\u0060': "'",   # Grave accent
+    '\u00b4': "'",   # Acute accent
+    # Dashes
+    '\u2013': '-',   # En dash
+    '\u2014': '-',   # Em dash
+    '\u2212': '-',   # Minus sign
+    '\u2010': '-',   # Hyphen
+    '\u2011': '-',   # Non-breaking hyphen
+    # Ellipsis
+    '\u2026': '...',
+    # Bullets and list markers
+    '\u2022': '-',   # Bullet
+    '\u2023': '>',   # Triangular bullet
+    '\u25aa': '-',   # Small square
+    '\u25cf': '-',   # Black circle
+    '\u25cb': 'o',   # White circle
+    '\u25a0': '-',   # Black square
+    '\u25a1': '-',   # White square
+    '\u2043': '-',   # Hyphen bullet
+    '\u27a2': '>',   # Arrow bullet
+    # Italian accented vowels - use plain ASCII for maximum compatibility
+    '\u00e0': 'a',   # a grave
+    '\u00c0': 'A',   # A grave
+    '\u00e8': 'e',   # e grave
+    '\u00c8': 'E',   # E grave
+    '\u00e9': 'e',   # e acute
+    '\u00c9': 'E',   # E acute
+    '\u00ec': 'i',   # i grave
+    '\u00cc': 'I',   # I grave
+    '\u00f2': 'o',   # o grave
+    '\u00d2': 'O',   # O grave
+    '\u00f9': 'u',   # u grave
+    '\u00d9': 'U',   # U grave
+    '\u00e1': 'a',   # a acute
+    '\u00ed': 'i',   # i acute
+    '\u00f3': 'o',   # o acute
+    '\u00fa': 'u',   # u acute
+    # Other accented chars
+    '\u00e2': 'a',   # a circumflex
+    '\u00ea': 'e',   # e circumflex
+    '\u00ee': 'i',   # i circumflex
+    '\u00f4': 'o',   # o circumflex
+    '\u00fb': 'u',   # u circumflex
+    '\u00e4': 'a',   # a umlaut
+    '\u00eb': 'e',   # e umlaut
+    '\u00ef': 'i',   # i umlaut
+    '\u00f6': 'o',   # o umlaut
+    '\u00fc': 'u',   # u umlaut
+    '\u00f1': 'n',   # n tilde
+    '\u00e7': 'c',   # c cedilla
+    # Symbols
+    '\u00b0': ' gradi',  # Degree symbol
+    '\u20ac': 'EUR',     # Euro sign
+    '\u00a3': 'GBP',     # Pound sign
+    '\u00a9': '(c)',     # Copyright
+    '\u00ae': '(R)',     # Registered
+    '\u2122': '(TM)',    # Trademark
+    '\u00b7': '-',       # Middle dot
+    '\u2027': '-',       # Hyphenation point
+    # Arrows
+    '\u2192': '->',      # Right arrow
+    '\u2190': '<-',      # Left arrow
+    '\u2194': '<->',     # Left right arrow
+    '\u21d2': '=>',      # Double right arrow
+    '\u21d0': '<=',      # Double left arrow
+    # Math
+    '\u00d7': 'x',       # Multiplication
+    '\u00f7': '/',       # Division
+    '\u2264': '<=',      # Less than or equal
+    '\u2265': '>=',      # Greater than or equal
+    '\u2260': '!=',      # Not equal
+    '\u2248': '~',       # Approximately equal
+    '\u00b1': '+/-',     # Plus-minus
+    '\u221e': 'inf',     # Infinity
+    # Spaces
+    '\u00a0': ' ',       # Non-breaking space
+    '\u2002': ' ',       # En space
+    '\u2003': ' ',       # Em space
+    '\u2009': ' ',       # Thin space
+    '\u200b': '',        # Zero-width space
+    '\u200c': '',        # Zero-width non-joiner
+    '\u200d': '',        # Zero-width joiner
+    '\ufeff': '',        # BOM
+    # Line breaks (\r\n is replaced before the table)
+    '\r': '\n',          # Old Mac line break
+}
+
+# str.translate would be the obvious tool, but CPython does a dict lookup
+# per character on non-ASCII text (~4x slower here, see
+# benchmarks/bench_sanitize.py): the regex scans in C and calls back only
+# on the few characters to replace
+_PDF_CHARS = re.compile("[" + "".join(re.escape(char) for char in PDF_REPLACEMENTS) + "]")
+
+
+def _replace_char(match):
+    return PDF_REPLACEMENTS[match.group()]
+
+
+def sanitize_pdf_text(text):
+    """
+    Text safe for the PDF core fonts: typographic characters replaced,
+    characters outside latin-1 removed, trailing spaces stripped per line
+    """
+    if not text:
+        return ""
+
+    text = _PDF_CHARS.sub(_replace_char, str(text).replace('\r\n', '\n'))
+    # Remaining non-latin-1 characters (emoji, CJK...) are skipped entirely
+    text = text.encode('latin-1', 'ignore').decode('latin-1')
+
+    # Remove trailing whitespace from each line but preserve structure
+    return '\n'.join(line.rstrip() for line in text.split('\n')).strip()
+
+
+# Kept even if the font has no glyph for them (handled by the layout)
+_LAYOUT_CHARS = frozenset('\n\t')
+
+
+def sanitize_unicode_pdf_text(text, charset):
+    """
+    Text for an embedded Unicode font: accents and symbols are kept, only
+    the characters without a glyph in charset (e.g. emoji) are removed
+    """
+    if not text:
+        return ""
+
+    text = str(text).replace('\r\n', '\n').replace('\r', '\n')
+    for char in set(text).difference(charset, _LAYOUT_CHARS):
+        text = text.replace(char, '')
+
+    return '\n'.join(line.rstrip() for line in text.split('\n')).strip()
@@ -0,0 +1,202 @@
+"""
+Workshop-wide rate limiting for Claude and Whisper calls
+Process-level token buckets (requests + tokens per minute), a concurrency
+cap and a fair round-robin queue per session, plus jittered backoff on
+429/529 responses instead of switching to a more expensive model.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import config
+
+# HTTP status codes that mean "slow down", not "this model doesn't work"
+RETRYABLE_STATUS = (429, 529)
+
+
+class RateLimitCancelled(Exception):
+    """Waiting for a slot was cancelled (e.g. the hedged attempt lost the race)"""
+
+
+class TokenBucket:
+    """Classic token bucket: refills at rate per second, up to capacity"""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount):
+        """Seconds until amount is available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Request/token buckets + concurrency cap with a fair queue per session
+
+    Sessions are served round-robin, so a participant who clicks several
+    times can't starve the rest of the room.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute=None, max_concurrent=8):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self._waiters = {}        # session_id -> deque of tickets
+        self._rotation = deque()  # sessions with waiting tickets, in serving order
+        self._cond = threading.Condition()
+
+    def _is_head(self, session_id, ticket):
+        return self._rotation and self._rotation[0] == session_id and self._waiters[session_id][0] is ticket
+
+    def _remove(self, session_id, ticket):
+        waiters = self._waiters.get(session_id)
+        if waiters and ticket in waiters:
+            waiters.remove(ticket)
+        if not waiters:
+            self._waiters.pop(session_id, None)
+            if session_id in self._rotation:
+                self._rotation.remove(session_id)
+
+    def acquire(self, session_id, tokens=0, cancelled=None):
+        """Block until this session's turn and budget allow a call"""
+        ticket = object()
+        with self._cond:
+            self._waiters.setdefault(session_id, deque()).append(ticket)
+            if session_id not in self._rotation:
+                self._rotation.append(session_id)
+            try:
+                while True:
+                    if cancelled is not None and cancelled.is_set():
+                        raise RateLimitCancelled()
+
+                    wait = 0.5
+                    if self._is_head(session_id, ticket) and self.active < self.max_concurrent:
+                        wait = self.requests.time_until(1)
+                        if self.tokens and tokens:
+                            wait = max(wait, self.tokens.time_until(tokens))
+                        if wait <= 0:
+                            self.requests.take(1)
+                            if self.tokens and tokens:
+                                self.tokens.take(tokens)
+                            self.active += 1
+                            # Round-robin: this session goes to the back of the line
+                            self._rotation.popleft()
+                            self._waiters[session_id].popleft()
+                            if self._waiters[session_id]:
+                                self._rotation.append(session_id)
+                            else:
+                                del self._waiters[session_id]
+                            self._cond.notify_all()
+                            return
+                    self._cond.wait(timeout=min(wait, 0.5))
+            except BaseException:
+                self._remove(session_id, ticket)
+                self._cond.notify_all()
+                raise
+
+    def release(self):
+        """Free the concurrency slot"""
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, session_id, tokens=0, cancelled=None):
+        """with limiter.slot(session_id, tokens): ... make the API call ..."""
+        self.acquire(session_id, tokens, cancelled)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def queue_position(self, session_id):
+        """1-based turn of the session among waiting sessions, 0 if not waiting"""
+        with self._cond:
+            try:
+                return list(self._rotation).index(session_id) + 1
+            except ValueError:
+                return 0
+
+    def queue_length(self):
+        with self._cond:
+            return len(self._rotation)
+
+
+def is_retryable(error):
+    """True for rate limit (429) and overloaded (529) API errors"""
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS
+
+
+def call_with_backoff(fn, cancelled=None, on_wait=None):
+    """
+    Call fn(), retrying 429/529 errors with exponential backoff + full jitter
+
+    Honors the server's retry-after header when present. on_wait(seconds)
+    is called before each sleep.
+    """
+    settings = config.RATE_LIMITS
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if not is_retryable(e) or attempt >= settings["max_retries"]:
+                raise
+            delay = random.uniform(0, min(settings["backoff_max"], settings["backoff_base"] * (2 ** attempt)))
+            retry_after = _retry_after(e)
+            if retry_after:
+                delay = max(delay, retry_after)
+            attempt += 1
+            if on_wait:
+                on_wait(delay)
+            if cancelled is not None:
+                if cancelled.wait(delay):
+                    raise RateLimitCancelled()
+            else:
+                time.sleep(delay)
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(service):
+    """Process-wide limiter for a service ("anthropic" or "openai")"""
+    with _limiters_lock:
+        if service not in _limiters:
+            settings = config.RATE_LIMITS[service]
+            _limiters[service] = RateLimiter(
+                requests_per_minute=settings["requests_per_minute"],
+                tokens_per_minute=settings.get("tokens_per_minute"),
+                max_concurrent=settings["max_concurrent"],
+            )
+        return _limiters[service]
@@ -0,0 +1,255 @@
+"""
+Keyword scoring engine
+Radar values, risk levels and the impact-matrix position computed from the
+analysis sections with one shared set of rules, so the Plotly dashboard and
+the PDF charts always agree and score each analysis only once (see
+utils.derived_metrics). Each section is lower-cased once and every keyword
+group is evaluated at most once per section. Pure module (no Streamlit).
+"""
+
+import re
+from collections import namedtuple
+
+from utils.structured_output import structured_radar_values, structured_risk_values
+
+# Keyword groups used by the rules below (matched as lower-case substrings)
+KEYWORDS = {
+    "fattibilita_alta": ("alta", "elevata", "ottima"),
+    "fattibilita_media": ("media", "moderata"),
+    "fattibilita_bassa": ("bassa", "difficile"),
+    "impatto_alto": ("significativ", "notevole", "alto", "50%", "60%", "70%"),
+    "impatto_medio": ("moderat", "medio", "30%", "40%"),
+    "rischio_alto": ("alto rischio", "critico", "grave"),
+    "rischio_medio": ("medio", "moderato"),
+    "rischio_basso": ("basso", "minim", "gestibil"),
+    "facile": ("semplice", "facile", "rapida", "minima"),
+    "difficile": ("complessa", "lunga", "estesa"),
+    "tecnico_alto": ("tecnico alto", "complessita elevata"),
+    "tecnico": ("tecnic",),
+    "privacy": ("gdpr", "privacy", "dati personali"),
+    "privacy_alto": ("critico", "alto"),
+    "organizzativo": ("cambiamento", "resistenza", "organizzativ"),
+    "legale": ("responsabilita", "legal", "compliance"),
+    "resistenza": ("resistenza", "change management"),
+    "autonomia_alta": ("sostituzione", "automazione completa", "completamente automatizzato",
+                       "senza intervento", "autonomo", "sostituire"),
+    "autonomia_bassa": ("augmentation", "supporto", "assistenza", "affiancamento",
+                        "supervisione", "approvazione", "revisione umana"),
+    "limiti_autonomi": ("senza supervisione", "autonomamente", "automatico"),
+    "limiti_umani": ("approvazione", "conferma", "supervisione", "controllo umano"),
+}
+
+# Texts the rules read (answers are prefixed with "answer:")
+SCORED_SECTIONS = (
+    "fattibilita_tecnica",
+    "riduzione_costi",
+    "risparmio_di_tempo_stimato",
+    "rischi_e_criticita",
+    "roadmap_implementazione",
+    "formazione_necessaria",
+    "problemi_legali_e_privacy",
+    "analisi_impatto_sostituzione_vs_augmentation",
+    "answer:to_be_azioni_limiti",
+)
+
+_FEASIBILITY_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*/\s*5')
+_SCORE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*/\s*10')
+
+
+class SectionHits:
+    """
+    Keyword lookups on the scored sections, shared by all the rules
+
+    Each section is lower-cased once; every rule looks up its keyword group
+    once and stops at the first hit. Plain
+    substring search (C) is used on purpose: for a few dozen short keywords
+    on sections of a few KB it is faster than one regex alternation, which
+    CPython tries at every character position (see benchmarks/bench_scoring.py).
+    """
+
+    def __init__(self, analysis_results, answers=None):
+        analysis_results = analysis_results or {}
+        answers = answers or {}
+        self.texts = {}
+        for section in SCORED_SECTIONS:
+            if section.startswith("answer:"):
+                text = answers.get(section[len("answer:"):], "")
+            else:
+                text = analysis_results.get(section, "")
+            self.texts[section] = str(text).lower() if text else ""
+
+    def has(self, group, *sections):
+        """True if any keyword of group occurs in any of sections"""
+        keywords = KEYWORDS[group]
+        for section in sections:
+            text = self.texts[section]
+            if text:
+                for kw in keywords:
+                    if kw in text:
+                        return True
+        return False
+
+    def found(self, group, section):
+        """Keywords of group found in section, in KEYWORDS order"""
+        text = self.texts[section]
+        return [kw for kw in KEYWORDS[group] if kw in text]
+
+
+# ============================================================================
+# RULES
+# ============================================================================
+
+def radar_values(analysis_results, hits=None):
+    """
+    Radar values (1-5): fattibilità tecnica, impatto business, gestione rischi,
+    ROI previsto, facilità implementazione
+    """
+    hits = hits or SectionHits(analysis_results)
+    values = []
+
+    # 1. Fattibilita Tecnica (look for X/5 pattern, else estimate based on keywords)
+    fatt_match = _FEASIBILITY_PATTERN.search(str(analysis_results.get("fattibilita_tecnica", "")))
+    if fatt_match:
+        values.append(float(fatt_match.group(1)))
+    elif hits.has("fattibilita_alta", "fattibilita_tecnica"):
+        values.append(4.5)
+    elif hits.has("fattibilita_media", "fattibilita_tecnica"):
+        values.append(3.0)
+    elif hits.has("fattibilita_bassa", "fattibilita_tecnica"):
+        values.append(2.0)
+    else:
+        values.append(3.5)
+
+    # 2. Impatto Business (from riduzione_costi and risparmio_di_tempo)
+    if hits.has("impatto_alto", "riduzione_costi", "risparmio_di_tempo_stimato"):
+        values.append(4.5)
+    elif hits.has("impatto_medio", "riduzione_costi", "risparmio_di_tempo_stimato"):
+        values.append(3.5)
+    else:
+        values.append(3.0)
+
+    # 3. Gestione Rischi (inverse: more risks = lower score)
+    if hits.has("rischio_alto", "rischi_e_criticita"):
+        values.append(2.0)
+    elif hits.has("rischio_medio", "rischi_e_criticita"):
+        values.append(3.0)
+    elif hits.has("rischio_basso", "rischi_e_criticita"):
+        values.append(4.5)
+    else:
+        values.append(3.0)
+
+    # 4. ROI Previsto (overall score converted from 10-scale to 5-scale)
+    score_match = _SCORE_PATTERN.search(str(analysis_results.get("score_complessivo", "")))
+    if score_match:
+        values.append(min(5.0, float(score_match.group(1)) / 2))
+    else:
+        values.append(3.5)
+
+    # 5. Facilita Implementazione (from roadmap and formazione)
+    if hits.has("facile", "roadmap_implementazione", "formazione_necessaria"):
+        values.append(4.5)
+    elif hits.has("difficile", "roadmap_implementazione", "formazione_necessaria"):
+        values.append(2.0)
+    else:
+        values.append(3.0)
+
+    return values
+
+
+def risk_values(analysis_results, hits=None):
+    """Risk levels (1=low, 5=high): tecnico, privacy/GDPR, organizzativo, legale, resistenza"""
+    hits = hits or SectionHits(analysis_results)
+    risks = []
+
+    # Tecnico
+    if hits.has("tecnico_alto", "rischi_e_criticita"):
+        risks.append(4)
+    elif hits.has("tecnico", "rischi_e_criticita"):
+        risks.append(3)
+    else:
+        risks.append(2)
+
+    # Privacy/GDPR
+    if hits.has("privacy", "problemi_legali_e_privacy"):
+        risks.append(4 if hits.has("privacy_alto", "problemi_legali_e_privacy") else 3)
+    else:
+        risks.append(2)
+
+    # Organizzativo
+    risks.append(3 if hits.has("organizzativo", "rischi_e_criticita") else 2)
+
+    # Legale
+    risks.append(3 if hits.has("legale", "problemi_legali_e_privacy") else 2)
+
+    # Resistenza al cambiamento
+    risks.append(3 if hits.has("resistenza", "rischi_e_criticita", "formazione_necessaria") else 2)
+
+    return risks
+
+
+def _count_items(text):
+    return len([s for s in str(text).replace(",", "\n").split("\n") if s.strip()])
+
+
+def process_position(analysis_results=None, answers=None, hits=None):
+    """
+    Position of the process in the impact matrix, (x, y) in 0.1-0.9
+    X = Process Complexity (from the answers), Y = AI Autonomy
+    (None, None) without answers
+    """
+    if not answers:
+        return None, None
+    hits = hits or SectionHits(analysis_results, answers)
+
+    # === X (Process Complexity) ===
+    complexity_score = 0
+    as_is_steps = answers.get("as_is_step", "")
+    if as_is_steps:
+        step_count = len([s for s in as_is_steps.strip().split("\n") if s.strip()])
+        complexity_score += min(step_count, 10)  # Max 10 points from steps
+    if answers.get("to_be_dati_sistemi"):
+        complexity_score += min(_count_items(answers["to_be_dati_sistemi"]), 5)  # systems/data sources
+    if answers.get("to_be_tool"):
+        complexity_score += min(_count_items(answers["to_be_tool"]), 5)  # tools to integrate
+    x = max(0.1, min(0.9, min(1.0, complexity_score / 15)))
+
+    # === Y (AI Autonomy) ===
+    autonomy_score = 0.5  # Start at middle
+    if analysis_results:
+        # Substitution vs augmentation text: +/-0.1 per keyword
+        section = "analisi_impatto_sostituzione_vs_augmentation"
+        for _ in hits.found("autonomia_alta", section):
+            autonomy_score += 0.1
+        for _ in hits.found("autonomia_bassa", section):
+            autonomy_score -= 0.1
+
+    # User's description of actions and limits
+    if hits.has("limiti_autonomi", "answer:to_be_azioni_limiti"):
+        autonomy_score += 0.15
+    if hits.has("limiti_umani", "answer:to_be_azioni_limiti"):
+        autonomy_score -= 0.15
+    y = max(0.1, min(0.9, autonomy_score))
+
+    return x, y
+
+
+AnalysisScores = namedtuple("AnalysisScores", ["radar", "risks", "position"])
+
+
+def score_analysis(analysis_results, answers=None):
+    """
+    Every chart value from one scan of each section
+
+    Typed values from the structured output (utils.structured_output)
+    take precedence over the keyword rules.
+
+    Returns:
+        AnalysisScores: radar (list), risks (list), position ((x, y))
+    """
+    analysis_results = analysis_results or {}
+    hits = SectionHits(analysis_results, answers)
+    return AnalysisScores(
+        radar=structured_radar_values(analysis_results) or radar_values(analysis_results, hits),
+        risks=structured_risk_values(analysis_results) or risk_values(analysis_results, hits),
+        position=process_position(analysis_results, answers, hits),
+    )
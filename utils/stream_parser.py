@@ -0,0 +1,69 @@
+"""
+Streaming helpers for Claude analysis
+Incremental parser that emits each section of a streamed response
+as soon as the following header closes it
+"""
+
+
+class SectionStreamParser:
+    """
+    Incremental line-based section parser
+
+    Args:
+        match_header: callable(line) -> section key if line is a header, else None
+        initial_key: key for text before the first header
+        keep_blank_lines: keep empty lines inside sections (needed for Markdown rendering)
+    """
+
+    def __init__(self, match_header, initial_key="introduction", keep_blank_lines=False):
+        self.match_header = match_header
+        self.keep_blank_lines = keep_blank_lines
+        self.current_key = initial_key
+        self.current_lines = []
+        self._pending = ""
+
+    def feed(self, chunk):
+        """Add a chunk of streamed text. Returns list of completed (key, content)"""
+        self._pending += chunk
+        if "\n" not in self._pending:
+            return []
+
+        *complete_lines, self._pending = self._pending.split("\n")
+        completed = []
+        for line in complete_lines:
+            section = self._consume_line(line)
+            if section:
+                completed.append(section)
+        return completed
+
+    def close(self):
+        """Flush remaining text at end of stream. Returns list of completed (key, content)"""
+        completed = []
+        if self._pending:
+            section = self._consume_line(self._pending)
+            self._pending = ""
+            if section:
+                completed.append(section)
+
+        content = "\n".join(self.current_lines).strip()
+        if content:
+            completed.append((self.current_key, content))
+        self.current_lines = []
+        return completed
+
+    def _consume_line(self, line):
+        key = self.match_header(line)
+        if key is None:
+            if line.strip() or self.keep_blank_lines:
+                self.current_lines.append(line)
+            return None
+
+        # Header closes the previous section
+        finished = None
+        content = "\n".join(self.current_lines).strip()
+        if content:
+            finished = (self.current_key, content)
+        self.current_key = key
+        self.current_lines = []
+        return finished
+
@@ -0,0 +1,228 @@
+"""
+Structured analysis output (tool use)
+The model writes the Markdown analysis as usual and then calls the
+"registra_analisi" tool with scores, ROI figures, phases, vendors and risk
+ratings as typed fields. The tool input is checked against the JSON schema
+here; when it is missing or invalid the caller keeps the regex parser output.
+Pure module (no Streamlit, no SDK imports).
+"""
+
+TOOL_NAME = "registra_analisi"
+
+# Appended to the static system prompt when the mode is enabled
+STRUCTURED_OUTPUT_NOTE = f"""
+
+# OUTPUT STRUTTURATO
+
+Dopo aver scritto l'analisi completa in Markdown, chiama UNA volta lo strumento
+`{TOOL_NAME}` riportando gli stessi valori dell'analisi come campi tipizzati.
+Non ripetere la prosa nello strumento e non scrivere altro testo dopo la chiamata."""
+
+# Radar / rischi: ordine delle dimensioni nei grafici e nel PDF
+RADAR_DIMENSIONS = (
+    "fattibilita_tecnica",
+    "impatto_business",
+    "gestione_rischi",
+    "roi_previsto",
+    "facilita_implementazione",
+)
+RISK_DIMENSIONS = ("tecnico", "privacy", "organizzativo", "legale", "resistenza")
+
+
+def _rating(description, maximum=5):
+    return {"type": "number", "minimum": 1, "maximum": maximum, "description": description}
+
+
+def _ratings(names, description):
+    return {
+        "type": "object",
+        "description": description,
+        "properties": {name: _rating(name.replace("_", " ")) for name in names},
+        "required": list(names),
+    }
+
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+V1_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer", "minimum": 1, "maximum": 10, "description": "SCORE COMPLESSIVO (X/10)"},
+        "feasibility": {"type": "integer", "minimum": 1, "maximum": 5,
+                        "description": "FATTIBILITÀ TECNICA (X/5)"},
+        "radar": _ratings(RADAR_DIMENSIONS, "Valutazione 1-5 (5 = migliore) per il grafico radar"),
+        "risks": _ratings(RISK_DIMENSIONS, "Livello di rischio 1-5 (5 = rischio più alto)"),
+        "time_saving_pct": {"type": "number", "minimum": 0, "maximum": 100,
+                            "description": "Risparmio di tempo stimato in percentuale"},
+        "cost_reduction_pct": {"type": "number", "minimum": 0, "maximum": 100,
+                               "description": "Riduzione costi stimata in percentuale"},
+    },
+    "required": ["score", "feasibility", "radar", "risks"],
+}
+
+_PHASE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "objective": {"type": "string"},
+        "activities": _STRING_LIST,
+        "metrics": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"metric": {"type": "string"}, "target": {"type": "string"}},
+                "required": ["metric", "target"],
+            },
+        },
+        "budget": {"type": "string", "description": "Importo senza simbolo €, es. \"15k\""},
+    },
+    "required": ["objective", "activities"],
+}
+
+V2_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer", "minimum": 1, "maximum": 10},
+        "strengths": _STRING_LIST,
+        "cautions": _STRING_LIST,
+        "roi_summary": {
+            "type": "object",
+            "properties": {
+                "risparmio_anno1": {"type": "string", "description": "Importo senza simbolo €, es. \"45k\""},
+                "investimento": {"type": "string", "description": "Importo senza simbolo €"},
+                "breakeven_mesi": {"type": "integer", "minimum": 0},
+                "roi_12mesi": {"type": "integer"},
+            },
+        },
+        "next_step": {"type": "string"},
+        "risk_level": {"type": "string", "enum": ["basso", "medio", "alto"]},
+        "phases": {
+            "type": "object",
+            "properties": {"phase_1": _PHASE_SCHEMA, "phase_2": _PHASE_SCHEMA, "phase_3": _PHASE_SCHEMA},
+            "additionalProperties": False,
+        },
+        "actions_week": _STRING_LIST,
+        "actions_2weeks": _STRING_LIST,
+        "actions_month1": _STRING_LIST,
+        "vendors": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "why": {"type": "string"},
+                    "best_for": {"type": "string"},
+                    "budget_range": {"type": "string"},
+                    "setup_time": {"type": "string"},
+                },
+                "required": ["name"],
+            },
+        },
+    },
+    "required": ["score", "strengths", "cautions", "roi_summary", "phases"],
+}
+
+
+def analysis_tool(schema, description):
+    """Tool definition for the Messages API"""
+    return {"name": TOOL_NAME, "description": description, "input_schema": schema}
+
+
+V1_TOOL = analysis_tool(V1_SCHEMA, "Registra i valori numerici dell'analisi di fattibilità (score, radar, rischi).")
+V2_TOOL = analysis_tool(V2_SCHEMA, "Registra i valori dell'analisi a 4 layer (score, ROI, fasi, azioni, vendor).")
+
+
+# ============================================================================
+# VALIDATION
+# Subset of JSON Schema used above: type, properties, required,
+# additionalProperties (false only), items, enum, minimum, maximum
+# ============================================================================
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+}
+
+
+def validate(value, schema, path="$"):
+    """
+    Check value against schema
+
+    Returns:
+        list: error messages ("$.radar.roi_previsto: ..."), empty if valid
+    """
+    expected = schema.get("type")
+    if expected and not _TYPE_CHECKS[expected](value):
+        return [f"{path}: atteso {expected}, trovato {type(value).__name__}"]
+
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: valore {value!r} non ammesso")
+    if "minimum" in schema and value < schema["minimum"]:
+        errors.append(f"{path}: {value} < {schema['minimum']}")
+    if "maximum" in schema and value > schema["maximum"]:
+        errors.append(f"{path}: {value} > {schema['maximum']}")
+
+    if expected == "object":
+        for name in schema.get("required", []):
+            if name not in value:
+                errors.append(f"{path}.{name}: mancante")
+        for name, subschema in schema.get("properties", {}).items():
+            if name in value:
+                errors.extend(validate(value[name], subschema, f"{path}.{name}"))
+        if schema.get("additionalProperties") is False:
+            for name in value:
+                if name not in schema.get("properties", {}):
+                    errors.append(f"{path}.{name}: non ammesso")
+    elif expected == "array" and "items" in schema:
+        for index, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{index}]"))
+    return errors
+
+
+def find_tool_input(tool_calls, name=TOOL_NAME):
+    """Input of the first call to tool `name` in [(name, input), ...], None if absent"""
+    for call_name, call_input in tool_calls or []:
+        if call_name == name:
+            return call_input
+    return None
+
+
+def tool_calls_from_content(content):
+    """[(name, input), ...] from the content blocks of a Messages API response"""
+    return [(block.name, block.input) for block in content or []
+            if getattr(block, "type", None) == "tool_use"]
+
+
+# ============================================================================
+# READERS
+# Typed values from a parsed analysis, None when the structured output is
+# absent (older cached analyses, mode disabled, invalid tool input)
+# ============================================================================
+
+def structured_data(analysis_results):
+    return (analysis_results or {}).get("structured") or None
+
+
+def structured_value(analysis_results, field):
+    data = structured_data(analysis_results)
+    return data.get(field) if data else None
+
+
+def structured_radar_values(analysis_results):
+    """Radar values in RADAR_DIMENSIONS order"""
+    radar = structured_value(analysis_results, "radar")
+    if not radar:
+        return None
+    return [float(radar[name]) for name in RADAR_DIMENSIONS]
+
+
+def structured_risk_values(analysis_results):
+    """Risk levels in RISK_DIMENSIONS order"""
+    risks = structured_value(analysis_results, "risks")
+    if not risks:
+        return None
+    return [risks[name] for name in RISK_DIMENSIONS]
@@ -0,0 +1,289 @@
+"""
+Prompt token budgeting
+Local token estimate (no API call) and per-answer budgets with compaction
+before the prompt is sent: spoken filler is trimmed, text repeated by voice
+transcription is deduplicated and, if still over budget, the answer is
+summarized extractively (beginning + end kept, middle elided).
+Also collects the billed usage reported by the API (prompt-cache included).
+"""
+
+import math
+import re
+import threading
+
+import config
+
+# Word pieces and single punctuation marks, roughly how BPE tokenizers split text
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Spoken filler that Whisper transcribes verbatim (Italian + English)
+_FILLER_PATTERN = re.compile(
+    r"(?<!\w)(?:e+h+m+|u+h*m+|m{2,}|e+h+|a+h+|uh+|um+)(?!\w)[,.]?\s*",
+    re.IGNORECASE,
+)
+# "il il", "che che": immediate word repetitions from dictation
+_REPEATED_WORD_PATTERN = re.compile(r"\b(\w+)(\s+\1\b)+", re.IGNORECASE)
+_SENTENCE_PATTERN = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)")
+
+ELISION_MARKER = " [...] "
+
+
+def estimate_tokens(text):
+    """
+    Local token estimate for Claude prompts
+
+    Each word counts ~1 token per 4 characters, each punctuation mark 1 token.
+    Within ~10-15% of the real count on Italian/English prose, which is
+    enough for budgeting and rate limiting.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(str(text)):
+        tokens += math.ceil(len(piece) / 4) if piece[0].isalnum() or piece[0] == "_" else 1
+    return tokens
+
+
+def trim_filler(text):
+    """Remove spoken filler ("ehm", "uhm", ...) and immediate word repetitions"""
+    text = _FILLER_PATTERN.sub("", text)
+    text = _REPEATED_WORD_PATTERN.sub(r"\1", text)
+    return re.sub(r"[ \t]{2,}", " ", text).strip()
+
+
+def dedupe_sentences(text):
+    """Drop sentences repeated verbatim (e.g. the same dictation appended twice)"""
+    seen = set()
+    kept = []
+    for sentence in _SENTENCE_PATTERN.findall(text):
+        key = re.sub(r"\W+", " ", sentence).strip().lower()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        kept.append(sentence)
+    return "".join(kept).strip()
+
+
+def summarize_extractive(text, max_tokens, head_ratio=0.7):
+    """Keep whole sentences from the beginning and the end within max_tokens"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sentences = [s for s in _SENTENCE_PATTERN.findall(text) if s.strip()]
+    budget = max(1, max_tokens - estimate_tokens(ELISION_MARKER))
+    head_budget = int(budget * head_ratio)
+
+    head, used = [], 0
+    for sentence in sentences:
+        cost = estimate_tokens(sentence)
+        if used + cost > head_budget:
+            break
+        head.append(sentence)
+        used += cost
+
+    tail = []
+    for sentence in reversed(sentences[len(head):]):
+        cost = estimate_tokens(sentence)
+        if used + cost > budget:
+            break
+        tail.insert(0, sentence)
+        used += cost
+
+    if not head and not tail:
+        # One huge sentence (no punctuation in dictation): cut on words
+        words, used = [], 0
+        for word in text.split():
+            used += estimate_tokens(word) + 1
+            if used > budget:
+                break
+            words.append(word)
+        return " ".join(words) + ELISION_MARKER.rstrip()
+
+    return ("".join(head).strip() + ELISION_MARKER + "".join(tail).strip()).strip()
+
+
+def compact_text(text, max_tokens):
+    """
+    Compact one answer to fit max_tokens
+
+    Returns:
+        tuple: (compacted_text, list of steps applied)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text, []
+
+    steps = []
+    for name, step in (("filler", trim_filler), ("dedupe", dedupe_sentences)):
+        compacted = step(text)
+        if compacted != text:
+            steps.append(name)
+            text = compacted
+        if estimate_tokens(text) <= max_tokens:
+            return text, steps
+
+    steps.append("summary")
+    return summarize_extractive(text, max_tokens), steps
+
+
+def field_budget(field_id, settings=None):
+    settings = settings or config.PROMPT_BUDGET
+    return settings.get("field_overrides", {}).get(field_id, settings["field_max_tokens"])
+
+
+def _compact_value(value, max_tokens, steps):
+    if isinstance(value, str):
+        compacted, applied = compact_text(value, max_tokens)
+        steps.update(applied)
+        return compacted
+    if isinstance(value, dict):
+        return {k: _compact_value(v, max_tokens, steps) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_compact_value(v, max_tokens, steps) for v in value]
+    return value
+
+
+def _value_tokens(value):
+    if isinstance(value, str):
+        return estimate_tokens(value)
+    if isinstance(value, dict):
+        return sum(_value_tokens(v) for v in value.values())
+    if isinstance(value, list):
+        return sum(_value_tokens(v) for v in value)
+    return 0
+
+
+def budget_answers(answers, scale=1.0, settings=None):
+    """
+    Apply per-field budgets to all answers (nested dicts/lists included)
+
+    Args:
+        answers: Dict of user answers (not modified)
+        scale: Multiplier on every budget (< 1 when the whole prompt is too long)
+
+    Returns:
+        tuple: (compacted answers, report dict)
+    """
+    settings = settings or config.PROMPT_BUDGET
+    compacted = {}
+    fields = {}
+    for field_id, value in answers.items():
+        before = _value_tokens(value)
+        budget = max(50, int(field_budget(field_id, settings) * scale))
+        steps = set()
+        compacted[field_id] = _compact_value(value, budget, steps)
+        if steps:
+            fields[field_id] = {
+                "tokens_before": before,
+                "tokens_after": _value_tokens(compacted[field_id]),
+                "steps": sorted(steps),
+            }
+
+    report = {
+        "answers_tokens_before": sum(_value_tokens(v) for v in answers.values()),
+        "answers_tokens_after": sum(_value_tokens(v) for v in compacted.values()),
+        "compacted_fields": fields,
+    }
+    report["tokens_saved"] = report["answers_tokens_before"] - report["answers_tokens_after"]
+    return compacted, report
+
+
+def fit_prompt(answers, build_prompt, settings=None, fixed_tokens=0):
+    """
+    Build a prompt whose estimated size fits the configured budget
+
+    Per-field budgets are applied first; if the whole prompt is still above
+    max_prompt_tokens the budgets are scaled down once, proportionally.
+    fixed_tokens counts text sent alongside the prompt (e.g. system instructions).
+
+    Returns:
+        tuple: (prompt, report) - report includes "prompt_tokens"
+    """
+    settings = settings or config.PROMPT_BUDGET
+    if not settings.get("enabled", True):
+        prompt = build_prompt(answers)
+        return prompt, {"prompt_tokens": fixed_tokens + estimate_tokens(prompt), "tokens_saved": 0,
+                        "compacted_fields": {}}
+
+    compacted, report = budget_answers(answers, settings=settings)
+    prompt = build_prompt(compacted)
+    prompt_tokens = fixed_tokens + estimate_tokens(prompt)
+
+    max_prompt = settings["max_prompt_tokens"]
+    if prompt_tokens > max_prompt and report["answers_tokens_after"]:
+        template_tokens = max(0, prompt_tokens - report["answers_tokens_after"])
+        scale = max(0.1, (max_prompt - template_tokens) / report["answers_tokens_after"])
+        compacted, scaled_report = budget_answers(answers, scale=scale, settings=settings)
+        prompt = build_prompt(compacted)
+        prompt_tokens = fixed_tokens + estimate_tokens(prompt)
+        report = scaled_report
+
+    report["prompt_tokens"] = prompt_tokens
+    return prompt, report
+
+
+class PromptMetrics:
+    """Process-wide prompt size counters (estimated tokens)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"prompts": 0, "prompt_tokens": 0, "tokens_saved": 0, "compacted_prompts": 0,
+                       "max_prompt_tokens": 0}
+
+    def record(self, report):
+        with self._lock:
+            self._stats["prompts"] += 1
+            self._stats["prompt_tokens"] += report.get("prompt_tokens", 0)
+            self._stats["tokens_saved"] += report.get("tokens_saved", 0)
+            self._stats["max_prompt_tokens"] = max(self._stats["max_prompt_tokens"], report.get("prompt_tokens", 0))
+            if report.get("compacted_fields"):
+                self._stats["compacted_prompts"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_prompt_tokens"] = stats["prompt_tokens"] / stats["prompts"] if stats["prompts"] else 0.0
+        return stats
+
+
+prompt_metrics = PromptMetrics()
+
+
+def usage_to_dict(usage):
+    """Anthropic Usage object -> dict with input/output and prompt-cache token counts"""
+    if usage is None:
+        return None
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+    }
+
+
+class UsageMetrics:
+    """Process-wide billed token counters, including prompt-cache reads/writes"""
+
+    FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(self.FIELDS, 0)
+        self._stats["requests"] = 0
+
+    def record(self, usage):
+        if not usage:
+            return
+        with self._lock:
+            self._stats["requests"] += 1
+            for field in self.FIELDS:
+                self._stats[field] += usage.get(field, 0)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self._stats)
+        cacheable = stats["cache_read_input_tokens"] + stats["cache_creation_input_tokens"]
+        stats["cache_hit_rate"] = stats["cache_read_input_tokens"] / cacheable if cacheable else 0.0
+        return stats
+
+
+usage_metrics = UsageMetrics()
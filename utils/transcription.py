@@ -0,0 +1,221 @@
+"""
+Chunked transcription of long recordings
+A long answer sent to Whisper as one file waits for the whole file to be
+transcribed and fails past the 25 MB limit. The recording is cut at pauses
+into chunks of about a minute (with an overlap where no pause is found),
+each chunk is encoded (utils.audio_encoding) and transcribed concurrently
+by a small thread pool, and the texts are stitched back in order, dropping
+the words repeated across an overlap. Progress (with the text so far) is
+reported in the caller's thread, so Streamlit can show it.
+Pure module (no Streamlit): the Whisper call is passed in.
+"""
+
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+import config
+from utils.audio_encoding import encode_for_upload, encode_segment, is_wav, speech_segment
+
+AudioChunk = namedtuple("AudioChunk", ["index", "start_ms", "end_ms", "audio"])
+Transcript = namedtuple("Transcript", ["text", "chunks", "original_bytes", "upload_bytes", "format"])
+
+# RMS frames used to look for pauses
+FRAME_MS = 20
+
+_WORD_NORMALIZE = re.compile(r"[^\w]+")
+
+
+# ============================================================================
+# SPLITTING
+# ============================================================================
+
+def _frame_levels(segment):
+    """RMS level of each FRAME_MS frame of a 16-bit mono segment"""
+    samples = np.frombuffer(segment.raw_data, dtype="<i2").astype(np.float32)
+    frame = max(1, segment.frame_rate * FRAME_MS // 1000)
+    count = len(samples) // frame
+    if not count:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame].reshape(count, frame)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def plan_chunks(segment, settings=None):
+    """
+    Cut points of a segment, as [(start_ms, end_ms), ...]
+
+    Each cut falls at the quietest moment (averaged over min_pause_ms)
+    within search_seconds of chunk_seconds. If that moment is not a pause
+    (below silence_db of the average level) the cut is a hard one and the
+    next chunk starts overlap_seconds earlier, so no word is lost.
+    """
+    settings = settings or config.VOICE_TRANSCRIPTION
+    duration_ms = len(segment)
+    if duration_ms <= settings["min_split_seconds"] * 1000:
+        return [(0, duration_ms)]
+
+    levels = _frame_levels(segment)
+    window = max(1, settings["min_pause_ms"] // FRAME_MS)
+    smoothed = np.convolve(levels, np.ones(window) / window, mode="same")
+    threshold = float(np.sqrt(np.mean(levels * levels))) * 10 ** (settings["silence_db"] / 20)
+
+    chunk = int(settings["chunk_seconds"] * 1000 / FRAME_MS)
+    search = int(settings["search_seconds"] * 1000 / FRAME_MS)
+    overlap = int(settings["overlap_seconds"] * 1000 / FRAME_MS)
+    total = len(levels)
+
+    spans = []
+    start = 0
+    while total - start > chunk + search:
+        low, high = start + chunk - search, start + chunk + search
+        quietest = low + int(np.argmin(smoothed[low:high]))
+        if smoothed[quietest] <= threshold:
+            cut, next_start = quietest, quietest
+        else:
+            cut, next_start = start + chunk, start + chunk - overlap
+        spans.append((start * FRAME_MS, cut * FRAME_MS))
+        start = next_start
+    spans.append((start * FRAME_MS, duration_ms))
+    return spans
+
+
+# ============================================================================
+# STITCHING
+# ============================================================================
+
+def _normalize(word):
+    return _WORD_NORMALIZE.sub("", word.lower())
+
+
+def merge_transcripts(texts, spans=None, max_overlap_words=20):
+    """
+    Join chunk texts in order, dropping the words the next chunk repeats
+
+    Looks for the longest run of words (normalized: case, punctuation) that
+    ends the text so far and starts the next text. Whisper may cut a word
+    at a chunk edge, so the run may skip up to two words at the start of
+    the next text or one at the end of the previous one. Runs shorter than
+    two words (three when skipping) are not treated as overlap.
+
+    With spans (the chunks' (start_ms, end_ms)) only hard cuts, where the
+    next chunk starts before the previous one ends, are checked: a pause
+    cut repeats nothing, so a real repetition ("sì sì") there is kept.
+    """
+    words = []
+    for index, text in enumerate(texts):
+        next_words = (text or "").split()
+        if not words:
+            words = next_words
+            continue
+        if spans is not None and spans[index][0] >= spans[index - 1][1]:
+            words += next_words
+            continue
+        drop, skip = _find_overlap(words, next_words, max_overlap_words)
+        words = words[:len(words) - drop] + next_words[skip:]
+    return " ".join(words)
+
+
+def _find_overlap(previous, following, max_words):
+    """(words to drop from previous, words to drop from following), (0, 0) if no overlap"""
+    tail = [_normalize(word) for word in previous[-(max_words + 1):]]
+    head = [_normalize(word) for word in following[:max_words + 2]]
+    for length in range(min(max_words, len(tail), len(head)), 1, -1):
+        for drop in (0, 1):
+            for skip in (0, 1, 2):
+                if (drop or skip) and length < 3:
+                    continue
+                end = len(tail) - drop
+                if end - length < 0 or skip + length > len(head):
+                    continue
+                if tail[end - length:end] == head[skip:skip + length]:
+                    return drop, skip + length
+    return 0, 0
+
+
+# ============================================================================
+# TRANSCRIPTION
+# ============================================================================
+
+def split_recording(audio_bytes, settings=None, audio_settings=None):
+    """
+    Decoded 16 kHz mono segment and its chunk spans
+
+    Returns:
+        tuple: (segment, spans), (None, None) if the audio is not a readable WAV
+    """
+    audio_settings = audio_settings or config.VOICE_AUDIO
+    if not audio_settings.get("compress", True) or not is_wav(audio_bytes):
+        return None, None
+    try:
+        segment = speech_segment(audio_bytes, audio_settings["sample_rate"])
+    except Exception:
+        return None, None
+    return segment, plan_chunks(segment, settings)
+
+
+def transcribe_recording(audio_bytes, transcribe_chunk, on_progress=None, settings=None, audio_settings=None):
+    """
+    Transcribe a recording in concurrent chunks
+
+    Args:
+        audio_bytes: recorded WAV
+        transcribe_chunk: callable(AudioChunk) -> text, called from pool
+            threads (the Whisper request, with rate limiting and retries)
+        on_progress: optional callable(done, total, text) called in this
+            thread after each chunk; text is the stitched transcript of the
+            chunks completed so far from the start of the recording
+
+    Returns:
+        Transcript: text, chunks, original_bytes, upload_bytes, format
+
+    Raises:
+        the first error of any chunk (the remaining chunks are cancelled)
+    """
+    settings = settings or config.VOICE_TRANSCRIPTION
+    audio_settings = audio_settings or config.VOICE_AUDIO
+
+    segment, spans = split_recording(audio_bytes, settings, audio_settings)
+    if segment is None or len(spans) == 1:
+        if segment is None:
+            # Not a readable WAV (or compression off): encode_for_upload sends it as it is
+            audio, end_ms = encode_for_upload(audio_bytes, audio_settings), None
+        else:
+            # Already decoded by split_recording: encoded without decoding the WAV again
+            audio, end_ms = encode_segment(segment, audio_settings, len(audio_bytes)), len(segment)
+        text = transcribe_chunk(AudioChunk(0, 0, end_ms, audio))
+        if on_progress:
+            on_progress(1, 1, text)
+        return Transcript(text, 1, len(audio_bytes), len(audio.data), audio.format)
+
+    def run(index, start_ms, end_ms):
+        # Encoding runs in the pool too: ffmpeg is a subprocess, numpy/pydub slicing is cheap
+        audio = encode_segment(segment[start_ms:end_ms], audio_settings)
+        return audio, transcribe_chunk(AudioChunk(index, start_ms, end_ms, audio))
+
+    texts = [None] * len(spans)
+    upload_bytes = 0
+    formats = set()
+    pool = ThreadPoolExecutor(max_workers=min(settings["max_parallel"], len(spans)),
+                              thread_name_prefix="transcribe")
+    try:
+        futures = {pool.submit(run, index, start, end): index for index, (start, end) in enumerate(spans)}
+        for done, future in enumerate(as_completed(futures), 1):
+            audio, text = future.result()
+            texts[futures[future]] = text
+            upload_bytes += len(audio.data)
+            formats.add(audio.format)
+            if on_progress:
+                ready = []
+                for chunk_text in texts:
+                    if chunk_text is None:
+                        break
+                    ready.append(chunk_text)
+                on_progress(done, len(spans), merge_transcripts(ready, spans))
+    finally:
+        # After an error: drop the queued chunks, don't wait for the running ones
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return Transcript(merge_transcripts(texts, spans), len(spans), len(audio_bytes), upload_bytes, "/".join(sorted(formats)))
@@ -0,0 +1,46 @@
+"""
+Content-addressed cache for Whisper transcriptions
+Key = hash(audio bytes, language, model). The recorder widget returns the
+same bytes on every rerun, so reruns, tab switches and "Sostituisci con
+trascrizione" reuse the transcript instead of paying Whisper again.
+"""
+
+import hashlib
+import threading
+import config
+from utils.cache import TieredCache, stable_hash
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_transcription_cache():
+    """Process-wide transcription cache (shared by all Streamlit sessions)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = config.TRANSCRIPTION_CACHE
+            _cache = TieredCache(
+                max_memory_bytes=settings["memory_max_bytes"],
+                disk_dir=settings["disk_dir"] if settings.get("disk_enabled", False) else None
+            )
+        return _cache
+
+
+def transcription_cache_key(audio_bytes, language, model):
+    """Cache key for one (recording, language, model) combination"""
+    return stable_hash("whisper", model, language, hashlib.sha256(audio_bytes).hexdigest())
+
+
+def get_cached_transcription(audio_bytes, language, model):
+    """Transcript of an identical recording, None if not cached"""
+    if not config.TRANSCRIPTION_CACHE.get("enabled", True) or not audio_bytes:
+        return None
+    return get_transcription_cache().get(transcription_cache_key(audio_bytes, language, model))
+
+
+def store_cached_transcription(audio_bytes, language, model, text):
+    """Store a transcript for later reruns with the same recording"""
+    if not config.TRANSCRIPTION_CACHE.get("enabled", True) or not audio_bytes or not text:
+        return
+    get_transcription_cache().set(transcription_cache_key(audio_bytes, language, model), text)
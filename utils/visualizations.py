@@ -2,6 +2,15 @@ import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
 import config
+from utils import scoring
+from utils.structured_output import structured_radar_values, structured_risk_values
+
+# Figure Plotly memorizzate per valori in ingresso (st.cache_resource: chiave =
+# hash del contenuto degli argomenti). Non st.cache_data: la copia via pickle a
+# ogni rerun costa più che ricostruire la figura (~25ms contro ~21ms per le tre
+# figure della dashboard, ~0.3ms da cache_resource). Le figure restituite sono
+# condivise: vanno trattate come sola lettura (st.plotly_chart non le modifica)
+FIGURE_CACHE_ENTRIES = 64
 
 def render_mermaid_diagram(content):
     """Render a Mermaid diagram graphically using Mermaid.js"""
@@ -138,10 +147,14 @@ def create_time_comparison_chart(as_is_time, to_be_time):
 
     return fig
 
-def create_feasibility_radar(analysis_results):
-    """Create a radar chart for feasibility analysis - DYNAMIC based on AI analysis"""
-    import re
+def feasibility_radar_values(analysis_results):
+    """Radar values (1-5) - typed values from the structured output, else keyword estimates (utils.scoring)"""
+    return structured_radar_values(analysis_results) or scoring.radar_values(analysis_results)
+
 
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def build_feasibility_radar(values):
+    """Radar figure for the given values (cached: same values -> same figure)"""
     # Define dimensions
     categories = [
         'Fattibilita Tecnica',
@@ -151,66 +164,7 @@ def create_feasibility_radar(analysis_results):
         'Facilita Implementazione'
     ]
 
-    # Extract values from analysis results
-    values = []
-
-    # 1. Fattibilita Tecnica (from fattibilita_tecnica section, look for X/5 pattern)
-    fatt_text = str(analysis_results.get("fattibilita_tecnica", ""))
-    fatt_match = re.search(r'(\d+(?:\.\d+)?)\s*/\s*5', fatt_text)
-    if fatt_match:
-        values.append(float(fatt_match.group(1)))
-    else:
-        # Estimate based on keywords
-        if any(kw in fatt_text.lower() for kw in ["alta", "elevata", "ottima"]):
-            values.append(4.5)
-        elif any(kw in fatt_text.lower() for kw in ["media", "moderata"]):
-            values.append(3.0)
-        elif any(kw in fatt_text.lower() for kw in ["bassa", "difficile"]):
-            values.append(2.0)
-        else:
-            values.append(3.5)
-
-    # 2. Impatto Business (from riduzione_costi and risparmio_di_tempo)
-    costi_text = str(analysis_results.get("riduzione_costi", ""))
-    tempo_text = str(analysis_results.get("risparmio_di_tempo_stimato", ""))
-    combined = (costi_text + tempo_text).lower()
-    if any(kw in combined for kw in ["significativ", "notevole", "alto", "50%", "60%", "70%"]):
-        values.append(4.5)
-    elif any(kw in combined for kw in ["moderat", "medio", "30%", "40%"]):
-        values.append(3.5)
-    else:
-        values.append(3.0)
-
-    # 3. Gestione Rischi (from rischi_e_criticita - inverse: more risks = lower score)
-    rischi_text = str(analysis_results.get("rischi_e_criticita", ""))
-    if any(kw in rischi_text.lower() for kw in ["alto rischio", "critico", "grave"]):
-        values.append(2.0)
-    elif any(kw in rischi_text.lower() for kw in ["medio", "moderato"]):
-        values.append(3.0)
-    elif any(kw in rischi_text.lower() for kw in ["basso", "minim", "gestibil"]):
-        values.append(4.5)
-    else:
-        values.append(3.0)
-
-    # 4. ROI Previsto (from overall score and benefits)
-    score_text = str(analysis_results.get("score_complessivo", ""))
-    score_match = re.search(r'(\d+(?:\.\d+)?)\s*/\s*10', score_text)
-    if score_match:
-        roi_value = float(score_match.group(1)) / 2  # Convert 10-scale to 5-scale
-        values.append(min(5.0, roi_value))
-    else:
-        values.append(3.5)
-
-    # 5. Facilita Implementazione (from roadmap and formazione)
-    roadmap_text = str(analysis_results.get("roadmap_implementazione", ""))
-    formazione_text = str(analysis_results.get("formazione_necessaria", ""))
-    combined = (roadmap_text + formazione_text).lower()
-    if any(kw in combined for kw in ["semplice", "facile", "rapida", "minima"]):
-        values.append(4.5)
-    elif any(kw in combined for kw in ["complessa", "lunga", "estesa"]):
-        values.append(2.0)
-    else:
-        values.append(3.0)
+    values = list(values)
 
     fig = go.Figure()
 
@@ -243,55 +197,22 @@ def create_feasibility_radar(analysis_results):
     return fig
 
 
-def create_risk_heatmap(analysis_results):
-    """Create a risk assessment heatmap"""
-    import re
-
-    # Define risk categories
-    risk_categories = ['Tecnico', 'Privacy/GDPR', 'Organizzativo', 'Legale', 'Resistenza']
-
-    # Extract risk levels from analysis
-    rischi_text = str(analysis_results.get("rischi_e_criticita", "")).lower()
-    privacy_text = str(analysis_results.get("problemi_legali_e_privacy", "")).lower()
+def create_feasibility_radar(analysis_results):
+    """Create a radar chart for feasibility analysis - DYNAMIC based on AI analysis"""
+    return build_feasibility_radar(tuple(feasibility_radar_values(analysis_results)))
 
-    # Calculate risk scores (1=low, 5=high)
-    risks = []
 
-    # Tecnico
-    if any(kw in rischi_text for kw in ["tecnico alto", "complessita elevata"]):
-        risks.append(4)
-    elif "tecnic" in rischi_text:
-        risks.append(3)
-    else:
-        risks.append(2)
+def risk_levels(analysis_results):
+    """Risk level (1=low, 5=high) per area - typed values from the structured output, else keyword estimates (utils.scoring)"""
+    return structured_risk_values(analysis_results) or scoring.risk_values(analysis_results)
 
-    # Privacy/GDPR
-    if any(kw in privacy_text for kw in ["gdpr", "privacy", "dati personali"]):
-        if any(kw in privacy_text for kw in ["critico", "alto"]):
-            risks.append(4)
-        else:
-            risks.append(3)
-    else:
-        risks.append(2)
-
-    # Organizzativo
-    if any(kw in rischi_text for kw in ["cambiamento", "resistenza", "organizzativ"]):
-        risks.append(3)
-    else:
-        risks.append(2)
-
-    # Legale
-    if any(kw in privacy_text for kw in ["responsabilita", "legal", "compliance"]):
-        risks.append(3)
-    else:
-        risks.append(2)
 
-    # Resistenza al cambiamento
-    formazione = str(analysis_results.get("formazione_necessaria", "")).lower()
-    if any(kw in rischi_text + formazione for kw in ["resistenza", "change management"]):
-        risks.append(3)
-    else:
-        risks.append(2)
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def build_risk_heatmap(risks):
+    """Risk bar chart for the given levels (cached)"""
+    # Define risk categories
+    risk_categories = ['Tecnico', 'Privacy/GDPR', 'Organizzativo', 'Legale', 'Resistenza']
+    risks = list(risks)
 
     # Create color scale based on risk level
     colors = []
@@ -322,80 +243,28 @@ def create_risk_heatmap(analysis_results):
 
     return fig
 
+
+def create_risk_heatmap(analysis_results):
+    """Create a risk assessment heatmap"""
+    return build_risk_heatmap(tuple(risk_levels(analysis_results)))
+
 def calculate_process_position(analysis_results=None, answers=None):
     """
     Calculate the position of the process in the impact matrix.
-    Returns (x, y) coordinates in range 0-1.
+    Returns (x, y) coordinates in range 0-1 (rules in utils.scoring, shared with the PDF).
     X = Process Complexity, Y = AI Autonomy
     """
-    if not answers:
-        return None, None
-
-    # === Calculate X (Process Complexity) ===
-    complexity_score = 0
-
-    # Count steps in AS-IS process
-    as_is_steps = answers.get("as_is_step", "")
-    if as_is_steps:
-        step_count = len([s for s in as_is_steps.strip().split("\n") if s.strip()])
-        complexity_score += min(step_count, 10)  # Max 10 points from steps
-
-    # Count systems/data sources
-    dati_sistemi = answers.get("to_be_dati_sistemi", "")
-    if dati_sistemi:
-        # Count commas and newlines as separators
-        system_count = len([s for s in dati_sistemi.replace(",", "\n").split("\n") if s.strip()])
-        complexity_score += min(system_count, 5)  # Max 5 points
-
-    # Count tools to integrate
-    tools = answers.get("to_be_tool", "")
-    if tools:
-        tool_count = len([t for t in tools.replace(",", "\n").split("\n") if t.strip()])
-        complexity_score += min(tool_count, 5)  # Max 5 points
-
-    # Normalize to 0-1 (max possible = 20)
-    x = min(1.0, complexity_score / 15)
-    # Add small offset to avoid edge placement
-    x = max(0.1, min(0.9, x))
-
-    # === Calculate Y (AI Autonomy) ===
-    autonomy_score = 0.5  # Start at middle
-
-    if analysis_results:
-        # Analyze substitution vs augmentation text
-        impatto_text = str(analysis_results.get("analisi_impatto_sostituzione_vs_augmentation", "")).lower()
-
-        # Keywords indicating high autonomy (substitution)
-        high_autonomy_keywords = ["sostituzione", "automazione completa", "completamente automatizzato",
-                                   "senza intervento", "autonomo", "sostituire"]
-        # Keywords indicating low autonomy (augmentation)
-        low_autonomy_keywords = ["augmentation", "supporto", "assistenza", "affiancamento",
-                                  "supervisione", "approvazione", "revisione umana"]
-
-        for kw in high_autonomy_keywords:
-            if kw in impatto_text:
-                autonomy_score += 0.1
-
-        for kw in low_autonomy_keywords:
-            if kw in impatto_text:
-                autonomy_score -= 0.1
-
-    # Also check user's description of actions and limits
-    azioni_limiti = str(answers.get("to_be_azioni_limiti", "")).lower()
-    if azioni_limiti:
-        if any(kw in azioni_limiti for kw in ["senza supervisione", "autonomamente", "automatico"]):
-            autonomy_score += 0.15
-        if any(kw in azioni_limiti for kw in ["approvazione", "conferma", "supervisione", "controllo umano"]):
-            autonomy_score -= 0.15
-
-    # Normalize to 0-1
-    y = max(0.1, min(0.9, autonomy_score))
-
-    return x, y
+    return scoring.process_position(analysis_results, answers)
 
 
 def create_impact_matrix(analysis_results=None, answers=None):
     """Create a 2x2 matrix for Substitution vs Augmentation with dynamic positioning"""
+    return build_impact_matrix(calculate_process_position(analysis_results, answers))
+
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def build_impact_matrix(position):
+    """Impact matrix with the process marker at position (x, y), or without it if unknown (cached)"""
 
     fig = go.Figure()
 
@@ -419,8 +288,8 @@ def create_impact_matrix(analysis_results=None, answers=None):
             hoverinfo='name'
         ))
 
-    # Calculate and add process marker if data available
-    x, y = calculate_process_position(analysis_results, answers)
+    # Add process marker if data available
+    x, y = position
     if x is not None and y is not None:
         fig.add_trace(go.Scatter(
             x=[x],
@@ -458,6 +327,7 @@ def create_impact_matrix(analysis_results=None, answers=None):
 
     return fig
 
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
 def create_score_gauge(score):
     """Create a gauge chart for overall project score"""
 
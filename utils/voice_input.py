@@ -1,12 +1,21 @@
 import streamlit as st
-from openai import OpenAI
-import tempfile
-import os
 from io import BytesIO
 import config
+from utils.clients import get_openai_client
+from utils.data_manager import get_session_id
+from utils.rate_limit import get_rate_limiter, call_with_backoff
+from utils.transcription import transcribe_recording
+from utils.transcription_cache import get_cached_transcription, store_cached_transcription
+
+# File name sent with the upload: Whisper infers the format from the extension
+AUDIO_FILENAME = "recording.wav"
+
+# Whisper request (also part of the transcription cache key)
+WHISPER_MODEL = "whisper-1"
+WHISPER_LANGUAGE = "it"
 
 def setup_voice_input():
-    """Initialize OpenAI client for Whisper API"""
+    """Shared OpenAI client for Whisper API (pooled per API key, see utils.clients)"""
     # Try session_state first, then config (lazy loading)
     api_key = st.session_state.get("openai_api_key") or config.get_api_key("OPENAI_API_KEY")
 
@@ -14,12 +23,22 @@ def setup_voice_input():
         return None
 
     try:
-        client = OpenAI(api_key=api_key)
-        return client
+        return get_openai_client(api_key)
     except Exception as e:
         st.error(f"Errore nell'inizializzazione dell'API OpenAI: {str(e)}")
         return None
 
+def audio_upload_file(audio_bytes, filename=AUDIO_FILENAME):
+    """
+    Named in-memory file for the Whisper upload (no temp file on disk)
+
+    BytesIO shares the recorded bytes until written to; the name gives the
+    SDK the multipart file name and Whisper the audio format.
+    """
+    audio_file = BytesIO(audio_bytes)
+    audio_file.name = filename
+    return audio_file
+
 def transcribe_audio(audio_bytes, client):
     """
     Transcribe audio using OpenAI Whisper API
@@ -35,29 +54,51 @@ def transcribe_audio(audio_bytes, client):
         st.error("Client OpenAI non inizializzato. Verifica la tua API key.")
         return None
 
-    try:
-        # Create a temporary file to save the audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_file_path = tmp_file.name
-
-        # Transcribe using Whisper
-        with open(tmp_file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="it"  # Italian language
-            )
-
-        # Clean up temporary file
-        os.unlink(tmp_file_path)
+    # Same recording already transcribed (rerun, tab switch, button click): no API call
+    cached = get_cached_transcription(audio_bytes, WHISPER_LANGUAGE, WHISPER_MODEL)
+    if cached:
+        return cached
 
+    try:
+        # Transcribe using Whisper (shared rate limiter, backoff on 429)
+        limiter = get_rate_limiter("openai")
+        session_id = get_session_id()
+        waiting = limiter.queue_length()
+        if waiting:
+            st.caption(f"⏳ {waiting} trascrizioni in coda prima della tua...")
+
+        def transcribe_chunk(chunk):
+            # Runs in the transcription pool: no Streamlit calls here
+            def request_transcript():
+                with limiter.slot(session_id):
+                    # New buffer per attempt: a retried upload starts from byte 0
+                    return client.audio.transcriptions.create(
+                        model=WHISPER_MODEL,
+                        file=audio_upload_file(chunk.audio.data, chunk.audio.filename),
+                        language=WHISPER_LANGUAGE  # Italian language
+                    )
+
+            return call_with_backoff(request_transcript).text
+
+        # Long recordings: chunks cut at pauses, transcribed in parallel, partial text shown
+        partial = st.empty()
+
+        def on_progress(done, total, text):
+            if total > 1 and done < total:
+                partial.info(f"📝 Trascritte {done}/{total} parti...\n\n{text}")
+
+        transcript = transcribe_recording(audio_bytes, transcribe_chunk, on_progress=on_progress)
+        partial.empty()
+
+        if transcript.format != "wav" or transcript.upload_bytes < transcript.original_bytes:
+            parts = f", {transcript.chunks} parti" if transcript.chunks > 1 else ""
+            st.caption(f"📦 Audio {transcript.original_bytes / 1024:,.0f} KB → "
+                       f"{transcript.upload_bytes / 1024:,.0f} KB ({transcript.format}{parts}) inviati")
+        store_cached_transcription(audio_bytes, WHISPER_LANGUAGE, WHISPER_MODEL, transcript.text)
         return transcript.text
 
     except Exception as e:
         st.error(f"Errore nella trascrizione audio: {str(e)}")
-        if os.path.exists(tmp_file_path):
-            os.unlink(tmp_file_path)
         return None
 
 def voice_input_component(question_text, help_text=""):
@@ -118,7 +159,8 @@ def voice_input_component(question_text, help_text=""):
             icon_name="microphone",
             icon_size="3x",
             key=recorder_key,
-            pause_threshold=300.0  # 5 minuti - disabilita stop automatico
+            pause_threshold=300.0,  # 5 minuti - disabilita stop automatico
+            sample_rate=config.VOICE_AUDIO["record_sample_rate"]
         )
 
         if audio_bytes: